@@ -6,23 +6,42 @@ Agent Layer for THT Scraper
 """
 
 import os
-import json
+import re
+import logging
+import orjson
 import sys
-from typing import List, Dict, Any
-from scraper import THTScraper
+import cProfile
+import click
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional
+
+# Library code stays quiet unless the application configures logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# THTScraper pulls in Selenium and the extraction libraries, so it is imported
+# on first use; importing this module for the tool schemas stays cheap.
+def __getattr__(name: str):
+    if name == "THTScraper":
+        from scraper import THTScraper
+        return THTScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Tool Wrappers ---
 def scrape_blog(team_id: str, blog_url: str, max_posts: int = 50, use_selenium: bool = False) -> Dict[str, Any]:
+    from scraper import THTScraper
     scraper = THTScraper(team_id, use_selenium=use_selenium)
     items = scraper.scrape_blog(blog_url, max_posts=max_posts)
     return scraper.export_to_knowledgebase_format(items)
 
 def scrape_pdf(team_id: str, pdf_path: str) -> Dict[str, Any]:
+    from scraper import THTScraper
     scraper = THTScraper(team_id)
     items = scraper.scrape_pdf(pdf_path)
     return scraper.export_to_knowledgebase_format(items)
 
 def scrape_urls(team_id: str, urls: List[str], use_selenium: bool = False) -> Dict[str, Any]:
+    from scraper import THTScraper
     scraper = THTScraper(team_id, use_selenium=use_selenium)
     items = scraper.scrape_urls(urls)
     return scraper.export_to_knowledgebase_format(items)
@@ -79,37 +98,75 @@ openai_tools = [
     }
 ]
 
+def _freeze(obj: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(value) for value in obj)
+    return obj
+
+# Immutable view of the schemas for callers that would otherwise copy them defensively.
+# Mapping proxies are not JSON serialisable; send get_openai_tools_bytes() instead.
+OPENAI_TOOLS = _freeze(openai_tools)
+
+# Serialized once at import; the schemas never change at runtime
+_OPENAI_TOOLS_JSON = orjson.dumps(openai_tools)
+
+def get_openai_tools_bytes() -> bytes:
+    """Return the tool schemas pre-serialized as JSON bytes."""
+    return _OPENAI_TOOLS_JSON
+
+# --- Intent Detection ---
+# All dispatch keywords are found in one case-insensitive pass over the message.
+# Keywords must be whole words ("blogger" is not "blog") but may be plural;
+# "http" also matches inside "https". Shared with enhanced_agent_layer.
+_INTENT_RE = re.compile(r'\b(?:pdfs?|blogs?|urls?)\b|http', re.IGNORECASE)
+_URL_RE = re.compile(r'https?://\S+')
+_EXIT_COMMANDS = frozenset({"exit", "quit"})
+
+def _detect_intents(message: str) -> set:
+    """Return the set of dispatch keywords present in the message, singularised."""
+    return {match.group().lower().rstrip('s') for match in _INTENT_RE.finditer(message)}
+
 # --- LLM Orchestration Example (OpenAI) ---
 def run_llm_agent(user_message: str, team_id: str = "test_team"):  # Demo only
     """
     Simulate an LLM agent that receives a user message, decides which tool to call,
     and returns the result. (In production, this would use OpenAI's API or similar.)
     """
-    print(f"\n🤖 [LLM] Received user message: {user_message}")
+    logger.info("[LLM] Received user message: %s", user_message)
     # For demo, we'll use simple heuristics to pick a tool
-    if "pdf" in user_message.lower():
+    intents = _detect_intents(user_message)
+    if "pdf" in intents:
         pdf_path = user_message.split()[-1]
-        print(f"[LLM] Calling scrape_pdf with: team_id={team_id}, pdf_path={pdf_path}")
+        logger.info("[LLM] Calling scrape_pdf with: team_id=%s, pdf_path=%s", team_id, pdf_path)
         result = scrape_pdf(team_id, pdf_path)
-    elif "blog" in user_message.lower() or "http" in user_message.lower():
+    elif "blog" in intents or "http" in intents:
         # Extract URL
-        tokens = user_message.split()
-        url = next((t for t in tokens if t.startswith("http")), None)
-        print(f"[LLM] Calling scrape_blog with: team_id={team_id}, blog_url={url}")
+        urls = _URL_RE.findall(user_message)
+        url = urls[0] if urls else None
+        logger.info("[LLM] Calling scrape_blog with: team_id=%s, blog_url=%s", team_id, url)
         result = scrape_blog(team_id, url)
-    elif "urls" in user_message.lower():
+    elif "url" in intents:
         # Extract URLs (comma-separated)
-        urls = [t for t in user_message.split() if t.startswith("http")]
-        print(f"[LLM] Calling scrape_urls with: team_id={team_id}, urls={urls}")
+        urls = _URL_RE.findall(user_message)
+        logger.info("[LLM] Calling scrape_urls with: team_id=%s, urls=%s", team_id, urls)
         result = scrape_urls(team_id, urls)
     else:
-        print("[LLM] Could not determine tool to call.")
+        logger.info("[LLM] Could not determine tool to call.")
         return None
-    print(f"[LLM] Tool call result: {len(result['items'])} items.")
+    logger.info("[LLM] Tool call result: %d items.", len(result['items']))
     return result
 
 # --- CLI for Demo/Testing ---
-def main():
+def _show_result(result: Optional[Dict[str, Any]]) -> None:
+    if result:
+        print(f"\n[Agent] Output: {orjson.dumps(result)[:1000].decode('utf-8', 'ignore')}...\n[truncated]")
+    else:
+        print("[Agent] No result.")
+
+def _interactive(team_id: Optional[str] = None):
     print("""
     ╔══════════════════════════════════════════════════════════════╗
     ║                THT Scraper Agent Layer Demo                 ║
@@ -118,17 +175,38 @@ def main():
     print("Type a high-level request (e.g. 'Import all technical content from https://interviewing.io/blog')")
     print("Or: 'Import this PDF aline_book.pdf' or 'Import these URLs https://a.com https://b.com'")
     print("Type 'exit' to quit.")
-    team_id = input("Team ID (default: test_team): ").strip() or "test_team"
+    if not team_id:
+        team_id = input("Team ID (default: test_team): ").strip() or "test_team"
     while True:
         user_message = input("\nUser: ").strip()
-        if user_message.lower() in ["exit", "quit"]:
+        if user_message.lower() in _EXIT_COMMANDS:
             print("Goodbye!")
             break
-        result = run_llm_agent(user_message, team_id)
-        if result:
-            print(f"\n[Agent] Output: {json.dumps(result, indent=2)[:1000]}...\n[truncated]")
-        else:
-            print("[Agent] No result.")
+        _show_result(run_llm_agent(user_message, team_id))
+
+def main():
+    """Interactive demo, or a single request when --message is given."""
+    @click.command()
+    @click.option('--team-id', default=None, help='Team ID for the knowledgebase (prompted if omitted)')
+    @click.option('--message', default=None, help='Run a single request and exit instead of starting the interactive demo')
+    @click.option('--profile', 'profile_path', default=None, help='Write cProfile stats for the run to this file')
+    def cli(team_id, message, profile_path):
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        profiler = cProfile.Profile() if profile_path else None
+        if profiler:
+            profiler.enable()
+        try:
+            if message:
+                _show_result(run_llm_agent(message, team_id or "test_team"))
+            else:
+                _interactive(team_id)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+                print(f"📊 Profile written to: {profile_path}")
+    
+    cli()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
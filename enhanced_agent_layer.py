@@ -7,60 +7,195 @@ Enhanced Agent Layer for THT Scraper
 """
 
 import os
-import json
+import logging
+import orjson
 import asyncio
-from typing import List, Dict, Any, Optional
-from intelligent_scraper import IntelligentScraper
+import atexit
+import threading
+import importlib.util
+from collections import OrderedDict
+import cProfile
+import click
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from extraction_cache import ExtractionCache, make_cache_key
+from agent_layer import _URL_RE, _EXIT_COMMANDS, _detect_intents, _freeze
+
+# Library code stays quiet unless the application configures logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# The scrapers pull in Selenium, Playwright and LLM SDKs, so they are imported
+# on first use; importing this module for the tool schemas stays cheap.
+if TYPE_CHECKING:
+    from intelligent_scraper import IntelligentScraper
+
+def __getattr__(name: str):
+    if name == "IntelligentScraper":
+        from intelligent_scraper import IntelligentScraper
+        return IntelligentScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Prefer uvloop for the event loop backing the synchronous wrappers
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Async line input lets the event loop keep working while the user types
+try:
+    from prompt_toolkit import PromptSession
+    PROMPT_TOOLKIT_AVAILABLE = True
+except ImportError:
+    PROMPT_TOOLKIT_AVAILABLE = False
+
+# --- Shared Event Loop ---
+_LOCAL = threading.local()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the persistent event loop used by the synchronous legacy wrappers.
+    One loop is kept per thread so concurrent callers never share a running loop.
+    """
+    loop = getattr(_LOCAL, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+        _LOCAL.loop = loop
+    return loop
+
+def _run_sync(coro):
+    """Run a coroutine to completion on this thread's persistent loop."""
+    return _get_loop().run_until_complete(coro)
+
+# --- Shared Scraper Instances ---
+# An IntelligentScraper's HTTP client and asyncio locks are bound to one event loop,
+# so instances are shared per (loop, configuration) and closed when evicted
+MAX_SHARED_SCRAPERS = 32
+_SCRAPERS: "OrderedDict[tuple, IntelligentScraper]" = OrderedDict()
+_SCRAPERS_LOCK = threading.Lock()
+
+def _current_loop() -> asyncio.AbstractEventLoop:
+    """Return the running loop, or this thread's persistent loop outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return _get_loop()
+
+def _get_scraper(team_id: str, llm_api_key: Optional[str] = None, use_selenium: bool = False,
+                 loop: Optional[asyncio.AbstractEventLoop] = None) -> "IntelligentScraper":
+    """
+    Return a shared IntelligentScraper for this configuration so its HTTP
+    sessions and LLM clients are reused across calls on the same event loop.
+    loop defaults to the running loop, or this thread's persistent loop.
+
+    Instances are keyed by (loop, team_id, llm_api_key, use_selenium) only;
+    callers must not mutate a returned scraper's configuration between calls.
+    """
+    loop = loop or _current_loop()
+    key = (loop, team_id, llm_api_key, bool(use_selenium))
+    evicted = []
+    with _SCRAPERS_LOCK:
+        scraper = _SCRAPERS.get(key)
+        if scraper is not None:
+            _SCRAPERS.move_to_end(key)
+            return scraper
+        # Scrapers of loops that have since closed can never be used again
+        for stale in [k for k in _SCRAPERS if k[0].is_closed()]:
+            evicted.append((stale[0], _SCRAPERS.pop(stale)))
+        from intelligent_scraper import IntelligentScraper
+        scraper = _SCRAPERS[key] = IntelligentScraper(team_id, llm_api_key=llm_api_key, use_selenium=use_selenium)
+        while len(_SCRAPERS) > MAX_SHARED_SCRAPERS:
+            old_key, old_scraper = _SCRAPERS.popitem(last=False)
+            evicted.append((old_key[0], old_scraper))
+    for old_loop, old_scraper in evicted:
+        _close_scraper(old_loop, old_scraper)
+    return scraper
+
+def _close_scraper(loop: asyncio.AbstractEventLoop, scraper: "IntelligentScraper") -> None:
+    """Close a scraper on its own loop, or just its threads if that loop is gone."""
+    try:
+        if loop.is_closed():
+            scraper.close()
+        elif loop.is_running() or loop is not getattr(_LOCAL, "loop", None):
+            # Runs as soon as the owning loop gets to it
+            asyncio.run_coroutine_threadsafe(scraper.aclose(), loop)
+        else:
+            loop.run_until_complete(scraper.aclose())
+    except Exception as e:
+        logger.debug("Failed to close shared scraper: %s", e)
+        scraper.close()
+
+async def _close_loop_scrapers() -> None:
+    """Close every shared scraper bound to the running loop, before the loop ends."""
+    loop = asyncio.get_running_loop()
+    with _SCRAPERS_LOCK:
+        scrapers = [_SCRAPERS.pop(key) for key in [k for k in _SCRAPERS if k[0] is loop]]
+    for scraper in scrapers:
+        try:
+            await scraper.aclose()
+        except Exception as e:
+            logger.debug("Failed to close shared scraper: %s", e)
+
+@atexit.register
+def _close_all_scrapers() -> None:
+    with _SCRAPERS_LOCK:
+        scrapers = list(_SCRAPERS.items())
+        _SCRAPERS.clear()
+    for key, scraper in scrapers:
+        _close_scraper(key[0], scraper)
+
+# --- Extraction Cache ---
+# Pages change, so cached URL results expire like the scraper's page cache
+EXTRACTION_CACHE_TTL_SECONDS = float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+_EXTRACTION_CACHE = ExtractionCache(
+    os.getenv("EXTRACTION_CACHE_DIR", ".extraction_cache"), ttl=EXTRACTION_CACHE_TTL_SECONDS
+)
 
 # --- Tool Wrappers for Function Calling ---
-async def scrape_intelligent(team_id: str, request: str, max_items: int = 10, use_selenium: bool = False) -> Dict[str, Any]:
+async def scrape_intelligent(team_id: str, request: str, max_items: int = 10, use_selenium: bool = False,
+                             use_cache: bool = True) -> Dict[str, Any]:
     """
     Intelligent scraping that handles both URLs and natural language.
+    Successful URL results are cached on disk for EXTRACTION_CACHE_TTL_SECONDS, keyed by
+    the request and its settings; use_cache=False skips the lookup and refreshes the entry.
+    Natural language results are cached by the scraper itself.
     """
-    scraper = IntelligentScraper(team_id, use_selenium=use_selenium)
-    return await scraper.process_request(request, max_items)
+    scraper = _get_scraper(team_id, use_selenium=use_selenium)
+    if scraper.is_natural_language_request(request):
+        return await scraper.process_request(request, max_items)
+    
+    from intelligent_scraper import BROWSER_AGENT_MODEL, EXTRACTION_PROMPT_VERSION
+    cache_key = make_cache_key(
+        "openai", BROWSER_AGENT_MODEL, EXTRACTION_PROMPT_VERSION,
+        team_id, request, max_items, use_selenium
+    )
+    # The cache reads and writes files, so keep it off the event loop
+    if use_cache:
+        cached = await asyncio.to_thread(_EXTRACTION_CACHE.get, cache_key)
+        if cached is not None:
+            return cached
+    
+    result = await scraper.process_request(request, max_items)
+    await asyncio.to_thread(_EXTRACTION_CACHE.put, cache_key, result)
+    return result
 
 def scrape_blog(team_id: str, blog_url: str, max_posts: int = 50, use_selenium: bool = False) -> Dict[str, Any]:
     """
     Legacy blog scraping function for backward compatibility.
     """
-    scraper = IntelligentScraper(team_id, use_selenium=use_selenium)
-    # Run synchronously for backward compatibility
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(scraper.handle_direct_url(blog_url, max_posts))
-        return result
-    finally:
-        loop.close()
+    return _run_sync(_get_scraper(team_id, use_selenium=use_selenium).handle_direct_url(blog_url, max_posts))
 
 def scrape_pdf(team_id: str, pdf_path: str) -> Dict[str, Any]:
     """
     Legacy PDF scraping function for backward compatibility.
     """
-    scraper = IntelligentScraper(team_id)
-    # Run synchronously for backward compatibility
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(scraper.handle_direct_url(pdf_path))
-        return result
-    finally:
-        loop.close()
+    return _run_sync(_get_scraper(team_id).handle_direct_url(pdf_path))
 
 def scrape_urls(team_id: str, urls: List[str], use_selenium: bool = False) -> Dict[str, Any]:
     """
     Legacy URL scraping function for backward compatibility.
     """
-    scraper = IntelligentScraper(team_id, use_selenium=use_selenium)
-    # Run synchronously for backward compatibility
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(scraper.handle_direct_url(urls[0] if len(urls) == 1 else urls[0]))
-        return result
-    finally:
-        loop.close()
+    return _run_sync(_get_scraper(team_id, use_selenium=use_selenium).handle_direct_urls(urls))
 
 # --- Enhanced Tool Schemas for LLM ---
 enhanced_openai_tools = [
@@ -75,7 +210,8 @@ enhanced_openai_tools = [
                     "team_id": {"type": "string", "description": "Team ID for the knowledgebase"},
                     "request": {"type": "string", "description": "Either a direct URL or natural language request like 'go to Quora software engineering and scrape the second post'"},
                     "max_items": {"type": "integer", "default": 10, "description": "Maximum number of items to extract"},
-                    "use_selenium": {"type": "boolean", "default": False, "description": "Use Selenium for JavaScript-heavy sites"}
+                    "use_selenium": {"type": "boolean", "default": False, "description": "Use Selenium for JavaScript-heavy sites"},
+                    "use_cache": {"type": "boolean", "default": True, "description": "Reuse a recent cached result for the same URL request; set false to refresh"}
                 },
                 "required": ["team_id", "request"]
             }
@@ -131,46 +267,94 @@ enhanced_openai_tools = [
     }
 ]
 
+# Immutable view of the schemas for callers that would otherwise copy them defensively.
+# Mapping proxies are not JSON serialisable; send get_enhanced_openai_tools_bytes() instead.
+ENHANCED_OPENAI_TOOLS = _freeze(enhanced_openai_tools)
+
+# Serialized once at import; the schemas never change at runtime
+_ENHANCED_OPENAI_TOOLS_JSON = orjson.dumps(enhanced_openai_tools)
+
+def get_enhanced_openai_tools_bytes() -> bytes:
+    """Return the tool schemas pre-serialized as JSON bytes."""
+    return _ENHANCED_OPENAI_TOOLS_JSON
+
 # --- LLM Orchestration with Enhanced Capabilities ---
 async def run_enhanced_llm_agent(user_message: str, team_id: str = "test_team", llm_api_key: Optional[str] = None):
     """
     Enhanced LLM agent that can handle both function calling and natural language requests.
     """
-    print(f"\n🤖 [Enhanced LLM] Received user message: {user_message}")
+    logger.info("[Enhanced LLM] Received user message: %s", user_message)
     
     # Check if it's a natural language request that should use browser-use directly
-    scraper = IntelligentScraper(team_id, llm_api_key=llm_api_key)
+    scraper = _get_scraper(team_id, llm_api_key)
     
     if scraper.is_natural_language_request(user_message):
-        print(f"[Enhanced LLM] Detected natural language request, using browser-use")
+        logger.debug("[Enhanced LLM] Detected natural language request, using browser-use")
         result = await scraper.process_request(user_message)
     else:
         # Use simple heuristics for backward compatibility
-        print(f"[Enhanced LLM] Using function calling approach")
-        if "pdf" in user_message.lower():
+        logger.debug("[Enhanced LLM] Using function calling approach")
+        # We are already inside a running loop, so await the scraper directly
+        # rather than going through the synchronous legacy wrappers.
+        intents = _detect_intents(user_message)
+        if "pdf" in intents:
             pdf_path = user_message.split()[-1]
-            print(f"[Enhanced LLM] Calling scrape_pdf with: team_id={team_id}, pdf_path={pdf_path}")
-            result = scrape_pdf(team_id, pdf_path)
-        elif "blog" in user_message.lower() or "http" in user_message.lower():
+            logger.info("[Enhanced LLM] Calling scrape_pdf with: team_id=%s, pdf_path=%s", team_id, pdf_path)
+            result = await scraper.handle_direct_url(pdf_path)
+        elif "blog" in intents or "http" in intents:
             # Extract URL
-            tokens = user_message.split()
-            url = next((t for t in tokens if t.startswith("http")), None)
-            print(f"[Enhanced LLM] Calling scrape_blog with: team_id={team_id}, blog_url={url}")
-            result = scrape_blog(team_id, url)
-        elif "urls" in user_message.lower():
+            urls = _URL_RE.findall(user_message)
+            url = urls[0] if urls else None
+            logger.info("[Enhanced LLM] Calling scrape_blog with: team_id=%s, blog_url=%s", team_id, url)
+            result = await scraper.handle_direct_url(url, 50)
+        elif "url" in intents:
             # Extract URLs (comma-separated)
-            urls = [t for t in user_message.split() if t.startswith("http")]
-            print(f"[Enhanced LLM] Calling scrape_urls with: team_id={team_id}, urls={urls}")
-            result = scrape_urls(team_id, urls)
+            urls = _URL_RE.findall(user_message)
+            logger.info("[Enhanced LLM] Calling scrape_urls with: team_id=%s, urls=%s", team_id, urls)
+            result = await scraper.handle_direct_urls(urls)
         else:
-            print("[Enhanced LLM] Could not determine tool to call.")
+            logger.info("[Enhanced LLM] Could not determine tool to call.")
             return None
     
-    print(f"[Enhanced LLM] Tool call result: {len(result.get('items', []))} items.")
+    logger.info("[Enhanced LLM] Tool call result: %d items.", len(result.get('items', [])))
     return result
 
 # --- CLI for Demo/Testing ---
-async def main():
+_PROMPT_SESSION = None
+
+async def _ainput(prompt: str) -> str:
+    """Read a line without blocking the event loop."""
+    global _PROMPT_SESSION
+    if PROMPT_TOOLKIT_AVAILABLE:
+        if _PROMPT_SESSION is None:
+            _PROMPT_SESSION = PromptSession()
+        return await _PROMPT_SESSION.prompt_async(prompt)
+    return await asyncio.to_thread(input, prompt)
+
+async def _warm_scraper(team_id: str, llm_api_key: Optional[str] = None) -> None:
+    """Build the shared scraper in the background so the first request finds it ready."""
+    try:
+        await asyncio.to_thread(_get_scraper, team_id, llm_api_key, loop=asyncio.get_running_loop())
+    except Exception as e:
+        logger.debug("Scraper warm-up failed: %s", e)
+
+def _show_result(result: Optional[Dict[str, Any]], team_id: str) -> None:
+    """Print a result preview and save successful results to disk."""
+    if result:
+        if "error" in result:
+            print(f"\n[Agent] Error: {result['error']}")
+        else:
+            print(f"\n[Agent] Output: {orjson.dumps(result)[:1000].decode('utf-8', 'ignore')}...\n[truncated]")
+            
+            # Save to file
+            output_file = f"enhanced_agent_{team_id}.json"
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            print(f"📄 Saved to: {output_file}")
+    else:
+        print("[Agent] No result.")
+
+async def _interactive(team_id: Optional[str] = None, llm_api_key: Optional[str] = None):
     print("""
     ╔══════════════════════════════════════════════════════════════╗
     ║            Enhanced THT Scraper Agent Layer                 ║
@@ -183,38 +367,62 @@ async def main():
     print("  - PDF files: 'Import this PDF aline_book.pdf'")
     print("Type 'exit' to quit.")
     
-    team_id = input("\nTeam ID (default: test_team): ").strip() or "test_team"
+    if not team_id:
+        team_id = (await _ainput("\nTeam ID (default: test_team): ")).strip() or "test_team"
     
     # Check for browser-use
-    try:
-        from browser_use import Agent
-        llm_api_key = input("\nLLM API Key (optional, for natural language): ").strip() or None
-    except ImportError:
+    if importlib.util.find_spec("browser_use") is None:
         print("\n⚠️  browser-use not available. Install with: pip install browser-use")
         print("   Only direct URLs and basic requests will work.")
         llm_api_key = None
+    elif llm_api_key is None:
+        llm_api_key = (await _ainput("\nLLM API Key (optional, for natural language): ")).strip() or None
+    
+    # Keep a reference so the warm-up task is not garbage collected
+    warm_task = asyncio.create_task(_warm_scraper(team_id, llm_api_key))
     
     while True:
-        user_message = input("\nUser: ").strip()
-        if user_message.lower() in ["exit", "quit"]:
+        user_message = (await _ainput("\nUser: ")).strip()
+        if user_message.lower() in _EXIT_COMMANDS:
             print("Goodbye!")
             break
         
+        await warm_task
         result = await run_enhanced_llm_agent(user_message, team_id, llm_api_key)
-        
-        if result:
-            if "error" in result:
-                print(f"\n[Agent] Error: {result['error']}")
+        _show_result(result, team_id)
+
+async def _closing_scrapers(coro):
+    """Await coro, then close the shared scrapers it used while their loop still runs."""
+    try:
+        return await coro
+    finally:
+        await _close_loop_scrapers()
+
+def main():
+    """Interactive demo, or a single request when --message is given."""
+    @click.command()
+    @click.option('--team-id', default=None, help='Team ID for the knowledgebase (prompted if omitted)')
+    @click.option('--message', default=None, help='Run a single request and exit instead of starting the interactive demo')
+    @click.option('--llm-api-key', default=None, help='LLM API key for natural language requests')
+    @click.option('--profile', 'profile_path', default=None, help='Write cProfile stats for the run to this file')
+    def cli(team_id, message, llm_api_key, profile_path):
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        profiler = cProfile.Profile() if profile_path else None
+        if profiler:
+            profiler.enable()
+        try:
+            if message:
+                team_id = team_id or "test_team"
+                _show_result(asyncio.run(_closing_scrapers(run_enhanced_llm_agent(message, team_id, llm_api_key))), team_id)
             else:
-                print(f"\n[Agent] Output: {json.dumps(result, indent=2)[:1000]}...\n[truncated]")
-                
-                # Save to file
-                output_file = f"enhanced_agent_{team_id}.json"
-                with open(output_file, 'w') as f:
-                    json.dump(result, f, indent=2)
-                print(f"📄 Saved to: {output_file}")
-        else:
-            print("[Agent] No result.")
+                asyncio.run(_closing_scrapers(_interactive(team_id, llm_api_key)))
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+                print(f"📊 Profile written to: {profile_path}")
+    
+    cli()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    main()
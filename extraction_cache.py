@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Extraction Cache for THT Scraper
+- Content-addressable, disk-backed cache for knowledgebase results
+- Entries are stored as plain JSON files named by the SHA-256 of the request
+- Cached entries are revalidated on read; malformed or expired ones are evicted
+- An optional in-memory semantic index maps paraphrased requests to cached keys
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import orjson
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGEBASE_ITEM_FIELDS = ("title", "content", "content_type", "source_url", "author", "user_id")
+_REQUIRED_ITEM_FIELDS = frozenset(KNOWLEDGEBASE_ITEM_FIELDS)
+
+def make_cache_key(*parts: Union[str, bytes, int, bool, None]) -> bytes:
+    """
+    Build a cache key from the given parts. Every part is length-prefixed
+    before hashing so that different splits of the same bytes never collide.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+def is_valid_knowledgebase_result(data: Any) -> bool:
+    """Check that data has the knowledgebase shape and is not an error result."""
+    if not isinstance(data, dict) or "error" in data:
+        return False
+    if not isinstance(data.get("team_id"), str) or not isinstance(data.get("items"), list):
+        return False
+    return all(
+        isinstance(item, dict) and _REQUIRED_ITEM_FIELDS <= item.keys()
+        for item in data["items"]
+    )
+
+# Read once at import; os.umask can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes) -> None:
+    """
+    Replace path with data via a uniquely named temporary file in the same directory,
+    so readers never see a partial file and concurrent writers never share a temp file.
+    The file keeps the existing target's mode, or gets the umask default like open() would.
+    """
+    path = Path(path)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        # NamedTemporaryFile creates files as 0600
+        os.chmod(tmp.name, mode)
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+class ExtractionCache:
+    """
+    Disk-backed cache mapping request keys to knowledgebase results.
+    Entries older than ttl seconds are treated as misses; None keeps them forever.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = ".extraction_cache", ttl: Optional[float] = None):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: bytes) -> Path:
+        return self.cache_dir / f"{key.hex()}.json"
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss."""
+        data = self._read(key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts for this cache instance."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _read(self, key: bytes) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                self.delete(key)
+                return None
+            data = orjson.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path.name, e)
+            self.delete(key)
+            return None
+
+        if not is_valid_knowledgebase_result(data):
+            logger.warning("Discarding invalid cache entry %s", path.name)
+            self.delete(key)
+            return None
+
+        return data
+
+    def put(self, key: bytes, result: Dict[str, Any]) -> bool:
+        """Store a successful result. Returns False if the result was not cacheable."""
+        if not is_valid_knowledgebase_result(result) or not result["items"]:
+            return False
+
+        path = self._path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomic(path, orjson.dumps(result))
+            return True
+        except OSError as e:
+            logger.warning("Failed to write cache entry %s: %s", path.name, e)
+            return False
+
+    def delete(self, key: bytes) -> None:
+        """Remove the cached result for key if present."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+class SemanticCache:
+    """
+    In-memory index of request embeddings pointing at ExtractionCache keys.
+    Lookups compare a query embedding against all stored embeddings in one
+    matrix-vector product and return the best key above the threshold.
+    Entries are grouped by scope so results for different settings never mix.
+    """
+
+    def __init__(self, threshold: float = 0.92):
+        self.threshold = threshold
+        self._index: Dict[Hashable, Tuple[Any, List[bytes]]] = {}
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def __contains__(self, scope: Hashable) -> bool:
+        """True if any request has been recorded under scope."""
+        return scope in self._index
+
+    def lookup(self, embedding: Sequence[float], scope: Hashable = None) -> Optional[bytes]:
+        """Return the cache key of the closest stored request, or None below the threshold."""
+        if not NUMPY_AVAILABLE or scope not in self._index:
+            return None
+        matrix, keys = self._index[scope]
+        similarities = matrix @ self._normalize(embedding)
+        best = int(similarities.argmax())
+        return keys[best] if similarities[best] >= self.threshold else None
+
+    def add(self, embedding: Sequence[float], key: bytes, scope: Hashable = None) -> None:
+        """Record the embedding of a request whose result is cached under key."""
+        if not NUMPY_AVAILABLE:
+            return
+        vector = self._normalize(embedding)[np.newaxis, :]
+        if scope in self._index:
+            matrix, keys = self._index[scope]
+            self._index[scope] = (np.vstack((matrix, vector)), keys + [key])
+        else:
+            self._index[scope] = (vector, [key])
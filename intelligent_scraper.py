@@ -7,28 +7,42 @@ Intelligent Scraper Layer for THT Scraper
 """
 
 import asyncio
+import atexit
 import re
-import json
+import orjson
+import aiofiles
 import logging
 import os
-from typing import List, Dict, Any, Optional, Union
-from urllib.parse import urljoin, urlparse
+import functools
+import contextlib
+import threading
+import importlib.util
+import multiprocessing
+import click
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
+from urllib.parse import urlsplit
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv()
 
+# Read once, after .env is loaded; used by the browser agent, decisions and embeddings
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
 # Import existing scraper components
-from scraper import THTScraper, BlogExtractor
+from scraper import THTScraper, BlogExtractor, PDFExtractor, init_pdf_pool_worker
+from extraction_cache import ExtractionCache, SemanticCache, make_cache_key, NUMPY_AVAILABLE
 
-# Import browser-use for intelligent navigation
-try:
-    from browser_use import Agent
-    from langchain_openai import ChatOpenAI
-    BROWSER_USE_AVAILABLE = True
-except ImportError:
-    BROWSER_USE_AVAILABLE = False
+# browser-use and langchain-openai are heavy, so only check they are installed here;
+# they are imported on the first natural language request
+BROWSER_USE_AVAILABLE = (
+    importlib.util.find_spec("browser_use") is not None
+    and importlib.util.find_spec("langchain_openai") is not None
+)
+if not BROWSER_USE_AVAILABLE:
     logging.warning("browser-use not available - natural language requests will be limited")
 
 # Import Firecrawl for crawling functionality
@@ -41,19 +55,406 @@ except ImportError:
 
 # Import OpenAI for intelligent decision making
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     logging.warning("openai not available - intelligent decision making will be limited")
 
+# HTTP/2 needs the optional h2 package; without it the OpenAI client stays on HTTP/1.1
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Prefer uvloop for the CLI's event loop; the stdlib loop is used where it isn't installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Model used by the browser-use agent for natural language requests
+BROWSER_AGENT_MODEL = "gpt-4o"
+
+# Bump when the extraction prompt or result format changes to invalidate old entries
+EXTRACTION_PROMPT_VERSION = "v1"
+
+# Natural language results are reused for a week before the agent is run again
+NL_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Paraphrased requests above this cosine similarity reuse a cached result
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+# Scrape/crawl decisions remembered per URL shape, see _url_signature
+DECISION_CACHE_SIZE = 1024
+
+# Keep-alive connections held open to the OpenAI API by the shared HTTP client
+OPENAI_MAX_KEEPALIVE = 20
+
+# Default number of requests or URLs processed at once by the batch methods
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+
+# --- Precompiled Patterns ---
+# A request is treated as a URL if it has one of these prefixes or is a bare domain like "example.com"
+_URL_PREFIXES = ('http://', 'https://', 'www.')
+_BARE_DOMAIN_RE = re.compile(r'[a-zA-Z0-9-]+\.(?:com|org|net|edu|io|co|dev)$')
+# URLs mentioned inside a natural language request
+_REQUEST_URL_RE = re.compile(r'(?:https?://|www\.)[^\s,;)"\']+', re.IGNORECASE)
+_URL_SCHEME_RE = re.compile(r'^(?:https?://)?(?:www\.)?', re.IGNORECASE)
+# Digit runs in a URL path, collapsed when grouping URLs by shape
+_DIGITS_RE = re.compile(r'\d+')
+# Tokens that matter when balancing braces: escapes (so \" never closes a string), quotes and braces
+_JSON_TOKEN_RE = re.compile(r'\\.|[{}"]', re.DOTALL)
+
+def _kb_item(title: str, content: str, source_url: str,
+             content_type: str = "web_page", author: str = "") -> Dict[str, Any]:
+    """
+    Build one knowledgebase item. Items stay plain dicts because callers,
+    the extraction cache and the JSON exports all index them by key.
+    """
+    return {
+        "title": title,
+        "content": content,
+        "content_type": content_type,
+        "source_url": source_url,
+        "author": author,
+        "user_id": ""
+    }
+
+def _find_json_object(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the first JSON object embedded in content, or None.
+    The common case of a single object spanning the outermost braces is
+    decoded directly; otherwise each balanced top-level {...} slice is tried in turn.
+    """
+    idx = content.find('{')
+    end = content.rfind('}')
+    if idx == -1 or end < idx:
+        return None
+    
+    try:
+        data = orjson.loads(content[idx:end + 1])
+        if isinstance(data, dict):
+            return data
+    except orjson.JSONDecodeError:
+        pass
+    
+    for start, stop in _balanced_brace_spans(content, idx):
+        try:
+            data = orjson.loads(content[start:stop])
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+def _balanced_brace_spans(content: str, pos: int = 0):
+    """
+    Yield (start, stop) for each top-level brace-balanced slice of content,
+    in a single left-to-right pass. Braces inside JSON strings are ignored.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    for match in _JSON_TOKEN_RE.finditer(content, pos):
+        token = match.group()
+        if in_string:
+            if token == '"':
+                in_string = False
+        elif token == '{':
+            if depth == 0:
+                start = match.start()
+            depth += 1
+        elif token == '}':
+            if depth:
+                depth -= 1
+                if depth == 0:
+                    yield start, match.end()
+        elif token == '"' and depth:
+            in_string = True
+
+def _trie_pattern(words) -> str:
+    """
+    Build a regex matching any of the given literal words, with shared prefixes
+    factored out (e.g. "fi(?:nd|rst)") so the engine never re-tests a common
+    prefix once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node) -> str:
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(alternatives) + ')?'
+        return alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    
+    return build(trie)
+
+# Indicator lists are matched as plain substrings, each compiled into one trie-shaped
+# alternation so a single scan replaces a Python-level loop over the list
+_NL_INDICATORS = (
+    'go to', 'visit', 'scrape', 'find', 'search', 'get', 'extract',
+    'second', 'third', 'first', 'last', 'post', 'article', 'page'
+)
+_NL_INDICATOR_RE = re.compile(_trie_pattern(_NL_INDICATORS), re.IGNORECASE)
+_MIN_NL_INDICATOR_LEN = min(map(len, _NL_INDICATORS))
+
+# Markers of an individual blog post rather than a blog homepage
+_BLOG_POST_INDICATORS = (
+    '/blog/', '/posts/', '/articles/', '/news/',  # Common blog post paths
+    '/202', '/2023/', '/2024/', '/2025/',  # Year-based posts
+    '/jan/', '/feb/', '/mar/', '/apr/', '/may/', '/jun/',  # Month-based posts
+    '/jul/', '/aug/', '/sep/', '/oct/', '/nov/', '/dec/',
+    'post-', 'article-', 'blog-',  # Post identifiers
+    '.html', '.php', '.aspx'  # File extensions
+)
+_BLOG_POST_INDICATOR_RE = re.compile(_trie_pattern(_BLOG_POST_INDICATORS), re.IGNORECASE)
+
+# Fallback scrape/crawl heuristics: markers of a single page win over markers of a collection
+_SINGLE_PAGE_INDICATORS = (
+    '/post/', '/article/', '/entry/', '/story/', '/blog/',
+    '/2024/', '/2023/', '/2022/', '/2021/', '/2020/',
+    '.html', '.php', '.aspx', '.jsp',
+    '/page/', '/single/', '/view/',
+    # Specific title patterns
+    '/how-to-', '/guide-', '/tutorial-', '/learn-',
+    '/getting-started', '/introduction', '/overview'
+)
+_SINGLE_PAGE_RE = re.compile(_trie_pattern(_SINGLE_PAGE_INDICATORS))
+_COLLECTION_INDICATORS = (
+    '/blog$', '/news$', '/docs$', '/articles$',
+    '/category/', '/tag/', '/topic/',
+    '/archive/', '/index$', '/home$',
+    '/search', '/filter', '/browse'
+)
+_COLLECTION_RE = re.compile(_trie_pattern(_COLLECTION_INDICATORS))
+
+# Blog paths at the end of the URL, or known blog platforms anywhere
+_BLOG_HOMEPAGE_RE = re.compile(r'/(?:blog|posts|articles|news)$|medium\.com|substack\.com|wordpress\.com', re.IGNORECASE)
+
+# --- Title Extraction Patterns ---
+# One pass over the leading lines finds markdown (#, ##, ###) and HTML (h1, h2) headers.
+# [^\S\n] and [^>\n] keep each match on a single line, as when lines were searched one by one.
+_HEADER_RE = re.compile(
+    r'^[^\S\n]*#{1,3}[^\S\n]+(?P<md>.+)$'
+    r'|<h(?P<level>[12])[^>\n]*>(?P<html>.+?)</h(?P=level)>',
+    re.IGNORECASE | re.MULTILINE
+)
+# Kept as separate patterns: a "title" key anywhere takes priority over "name" and "heading"
+_JSON_TITLE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'"title"\s*:\s*"([^"]+)"',
+    r'"name"\s*:\s*"([^"]+)"',
+    r'"heading"\s*:\s*"([^"]+)"',
+))
+# Title probing only looks at the start of agent output, which bounds the regex work
+# on very long or adversarial content
+_TITLE_SCAN_CHARS = 16 * 1024
+# First "# " or "## " header line with some text after it
+_MD_TITLE_RE = re.compile(r'^\s*#{1,2} [^\S\n]*(\S.*)$', re.MULTILINE)
+_SUBREDDIT_RE = re.compile(r'r/([a-zA-Z0-9_]+)')
+_QUORA_TOPIC_RE = re.compile(r'quora\s+([^a]+?)(?:\s+and|\s*$)')
+_MEDIUM_SEARCH_RE = re.compile(r'search.*?for\s+([^a]+?)(?:\s*$)')
+_WIKIPEDIA_SEARCH_RE = re.compile(r'wikipedia.*?for\s+([^a]+?)(?:\s*$)')
+# Every brand mentioned in a request, found in one scan; matched as plain substrings
+_BRAND_RE = re.compile(r'reddit|quora|medium|wikipedia|stack ?overflow|hacker news|hn')
+_BRAND_ALIASES = {'stack overflow': 'stackoverflow', 'hacker news': 'hn'}
+# (brand, topic pattern, title builder), in priority order when several brands are mentioned
+_BRAND_TITLES = (
+    ('reddit', _SUBREDDIT_RE, lambda m: f"Top Posts from r/{m.group(1)}"),
+    ('quora', _QUORA_TOPIC_RE, lambda m: f"Quora: {m.group(1).strip().title()}"),
+    ('medium', _MEDIUM_SEARCH_RE, lambda m: f"Medium Articles: {m.group(1).strip().title()}"),
+    ('wikipedia', _WIKIPEDIA_SEARCH_RE, lambda m: f"Wikipedia: {m.group(1).strip().title()}"),
+    ('stackoverflow', None, lambda m: "Stack Overflow Questions"),
+    ('hn', None, lambda m: "Hacker News Top Stories"),
+)
+# Filler words dropped from generic titles
+_TITLE_STOPWORDS = frozenset({'go', 'to', 'and', 'get', 'the', 'top', 'posts', 'from', 'for', 'about'})
+
+# --- Title Cleaning Patterns ---
+_WS_RE = re.compile(r'\s+')
+# HTML tags, URLs and markdown formatting characters, removed in a single pass
+_TITLE_STRIP_RE = re.compile(
+    r'<[^>]+>'
+    r'|http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+    r'|[*_`#]'
+)
+
+# --- PDF Process Pool ---
+# PDF text extraction is CPU-bound, so it runs in worker processes shared by all scrapers.
+# The pool is started on first use and shut down at interpreter exit. Workers are spawned
+# rather than forked: by then the parent runs event loop, executor and browser threads,
+# and forking a threaded process can copy held locks into the child.
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), initializer=init_pdf_pool_worker,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_PDF_POOL.shutdown, cancel_futures=True)
+        return _PDF_POOL
+
+def _extract_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+    """Extract PDF items in a worker process."""
+    return PDFExtractor().extract(pdf_path)
+
+# --- Request Classification ---
+def _looks_like_url(stripped: str) -> bool:
+    # Cheap literal prefix test first; the regex only runs for bare domains
+    return stripped.startswith(_URL_PREFIXES) or _BARE_DOMAIN_RE.match(stripped) is not None
+
+# Pure functions of their input, memoized since batches repeat the same requests and URLs
+@functools.lru_cache(maxsize=1024)
+def _is_natural_language(stripped: str) -> bool:
+    # Too short to contain any indicator
+    if len(stripped) < _MIN_NL_INDICATOR_LEN:
+        return False
+    
+    # Check if it looks like a URL
+    if _looks_like_url(stripped):
+        return False
+    
+    # Check for natural language indicators
+    return _NL_INDICATOR_RE.search(stripped) is not None
+
+def _parse_crawl(request: str) -> Tuple[bool, Optional[str]]:
+    # Returns (is a crawl command, URL to crawl or None); only the prefix is case-folded
+    stripped = request.strip()
+    if stripped[:6].lower() != 'crawl ':
+        return False, None
+    url_part = stripped[6:].strip()
+    return True, url_part if url_part.startswith(_URL_PREFIXES) else None
+
+@functools.lru_cache(maxsize=1024)
+def _is_blog_homepage(url: str) -> bool:
+    # If URL contains post indicators, it's likely an individual post
+    if _BLOG_POST_INDICATOR_RE.search(url):
+        return False
+    
+    # Check if it's likely a blog homepage
+    return _BLOG_HOMEPAGE_RE.search(url) is not None
+
+def _is_pdf_path(url: str) -> bool:
+    # Judged on the path's extension only, so hosts or queries that merely mention "pdf" don't count
+    return os.path.splitext(urlsplit(url).path)[1].lower() == '.pdf'
+
+def _url_signature(url: str) -> str:
+    # Scheme, host and path with digit runs collapsed, so /blog/2024/post-12 and
+    # /blog/2023/post-7 share one signature
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.lower()}{_DIGITS_RE.sub('N', parts.path)}"
+
+def _normalize_request_case(request: str) -> str:
+    # Lower-case a request for cache keys, except for its URLs, whose paths and
+    # queries are case-sensitive
+    pieces = []
+    last = 0
+    for match in _REQUEST_URL_RE.finditer(request):
+        pieces.append(request[last:match.start()].lower())
+        pieces.append(match.group())
+        last = match.end()
+    pieces.append(request[last:].lower())
+    return ''.join(pieces).strip()
+
+def _semantic_scope(team_id: str, request: str, max_items: int) -> Tuple[Any, ...]:
+    # Similar wording is only trusted between requests for the same team, item count
+    # and URLs; URLs are compared case-insensitively without scheme, "www." or a
+    # trailing slash or period
+    urls = frozenset(
+        _URL_SCHEME_RE.sub('', url).rstrip('/.').lower()
+        for url in _REQUEST_URL_RE.findall(request)
+    )
+    return (team_id, max_items, urls)
+
+# --- Title Cleaning ---
+# Called for every converted item, often more than once with the same text
+@functools.lru_cache(maxsize=4096)
+def _clean_title(title: str) -> str:
+    # Remove HTML tags, URLs and markdown formatting
+    title = _TITLE_STRIP_RE.sub('', title)
+    
+    # Remove extra whitespace, including gaps left by the removals
+    title = _WS_RE.sub(' ', title.strip())
+    
+    # Capitalize first letter of each word (title case)
+    title = title.title()
+    
+    # Limit length
+    if len(title) > 100:
+        title = title[:97] + "..."
+    
+    return title.strip()
+
+# Requests are often retried or rephrased identically, and each title costs several regex scans
+@functools.lru_cache(maxsize=512)
+def _title_from_request(request: str) -> str:
+    # Remove common prefixes
+    request_lower = request.lower()
+    
+    # Extract key information from request: the highest-priority brand mentioned
+    # decides the title, and only its topic pattern is run
+    brands = {_BRAND_ALIASES.get(m.group(), m.group()) for m in _BRAND_RE.finditer(request_lower)}
+    if brands:
+        _, topic_re, build_title = next(entry for entry in _BRAND_TITLES if entry[0] in brands)
+        topic_match = topic_re.search(request_lower) if topic_re else True
+        if topic_match:
+            return build_title(topic_match)
+    
+    # Generic fallback
+    words = request.split()
+    if len(words) > 3:
+        # Take first few meaningful words
+        # Lowercased up front; .title() below normalizes the case anyway
+        meaningful_words = [w for w in map(str.lower, words[:6]) if len(w) > 2 and w not in _TITLE_STOPWORDS]
+        if meaningful_words:
+            return f"{' '.join(meaningful_words[:4]).title()}"
+    
+    # Last resort: clean up the original request
+    return _clean_title(request)
+
+# --- Browser Resource Blocking ---
+# The agent reads pages through the DOM, so heavy assets only cost bandwidth and render time.
+# Set BROWSER_BLOCK_RESOURCES=0 to let the browser load everything.
+BLOCK_HEAVY_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "1") != "0"
+
+# Agents run in their own context of one shared browser; this caps how many at once
+MAX_BROWSER_CONTEXTS = 4
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media", "beacon"})
+
+async def _block_heavy_resources(route) -> None:
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Static part of the browser agent task, see _enhance_task_description
+_TASK_INSTRUCTIONS = """Complete the task below and extract its content.
+
+Requirements:
+- Extract the content in a structured format
+- Include title, content, author if available
+- Convert content to clean markdown format
+- Return the data in a format that can be parsed as JSON"""
+
 class IntelligentScraper:
     """
     Intelligent scraper that can handle both direct URLs and natural language requests.
+    Its HTTP client, browser session and asyncio locks belong to the event loop that
+    first uses them, so an instance must only be used from one loop.
     """
     
     def __init__(self, team_id: str, llm_api_key: Optional[str] = None, use_selenium: bool = False):
@@ -61,22 +462,37 @@ class IntelligentScraper:
         self.use_selenium = use_selenium
         
         # Get API key from parameter or environment variable
-        self.llm_api_key = llm_api_key or os.getenv("OPENAI_API_KEY")
+        self.llm_api_key = llm_api_key or OPENAI_API_KEY
         
         # Initialize existing scraper
         self.scraper = THTScraper(team_id, use_selenium=use_selenium)
         
-        # Initialize browser-use if available
-        self.browser_agent = None
-        if BROWSER_USE_AVAILABLE and self.llm_api_key:
-            try:
-                self.browser_agent = ChatOpenAI(model="gpt-4o", api_key=self.llm_api_key)
-                logger.info("Browser agent initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize browser agent: {e}")
-        elif BROWSER_USE_AVAILABLE and not self.llm_api_key:
+        # The existing scraper is blocking, so its calls run on this pool
+        self._executor = ThreadPoolExecutor(max_workers=16)
+        
+        # Browser session shared by all natural language requests, started on first use
+        self._browser_session = None
+        self._browser_session_lock = asyncio.Lock()
+        self._browser_context_semaphore = asyncio.Semaphore(MAX_BROWSER_CONTEXTS)
+        
+        # Cache for natural language results, which each cost a full browser agent run
+        self.nl_cache = ExtractionCache(
+            os.getenv("EXTRACTION_CACHE_DIR", ".extraction_cache"), ttl=NL_CACHE_TTL_SECONDS
+        )
+        self.semantic_cache = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD)
+        
+        # One pooled HTTP client for all async OpenAI traffic, closed in aclose().
+        # Only built when there is a key to call the API with.
+        self._openai_http_client = DefaultAsyncHttpxClient(
+            http2=H2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=OPENAI_MAX_KEEPALIVE)
+        ) if OPENAI_AVAILABLE and (OPENAI_API_KEY or self.llm_api_key) else None
+        
+        # The browser-use LLM is created on first access, see browser_agent
+        self._browser_agent = None
+        if BROWSER_USE_AVAILABLE and not self.llm_api_key:
             logger.warning("browser-use available but no API key found. Set OPENAI_API_KEY in .env file")
-        else:
+        elif not BROWSER_USE_AVAILABLE:
             logger.info("browser-use not available - natural language requests disabled")
         
         # Initialize Firecrawl if available
@@ -88,7 +504,7 @@ class IntelligentScraper:
                     self.firecrawl_app = AsyncFirecrawlApp(api_key=firecrawl_api_key)
                     logger.info("Firecrawl app initialized successfully")
                 except Exception as e:
-                    logger.warning(f"Failed to initialize Firecrawl app: {e}")
+                    logger.warning("Failed to initialize Firecrawl app: %s", e)
             else:
                 logger.warning("Firecrawl available but no API key found. Set FIRECRAWL_API_KEY in .env file")
         else:
@@ -96,113 +512,227 @@ class IntelligentScraper:
         
         # Initialize OpenAI for intelligent decision making
         self.openai_client = None
+        self._decision_cache: "OrderedDict[str, str]" = OrderedDict()
         if OPENAI_AVAILABLE:
-            openai_api_key = os.getenv("OPENAI_API_KEY")
-            if openai_api_key:
+            if OPENAI_API_KEY:
                 try:
-                    self.openai_client = OpenAI(api_key=openai_api_key)
+                    self.openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=self._openai_http_client)
                     logger.info("OpenAI client initialized successfully")
                 except Exception as e:
-                    logger.warning(f"Failed to initialize OpenAI client: {e}")
+                    logger.warning("Failed to initialize OpenAI client: %s", e)
             else:
                 logger.warning("OpenAI available but no API key found. Set OPENAI_API_KEY in .env file")
         else:
             logger.info("OpenAI not available - intelligent decision making disabled")
     
+    @property
+    def browser_agent(self):
+        """
+        LLM driving browser-use agents, or None if natural language requests are unavailable.
+        Created on first access so direct URL scraping never imports browser-use.
+        """
+        if self._browser_agent is None and BROWSER_USE_AVAILABLE and self.llm_api_key:
+            try:
+                from langchain_openai import ChatOpenAI
+                self._browser_agent = ChatOpenAI(
+                    model=BROWSER_AGENT_MODEL,
+                    api_key=self.llm_api_key,
+                    http_async_client=self._openai_http_client
+                )
+                logger.info("Browser agent initialized successfully")
+            except Exception as e:
+                logger.warning("Failed to initialize browser agent: %s", e)
+        return self._browser_agent
+    
+    async def __aenter__(self) -> "IntelligentScraper":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """
+        Shut down the shared browser session, the OpenAI HTTP client and the scraper thread pool.
+        """
+        if self._browser_session is not None:
+            try:
+                await self._browser_session.kill()
+            except Exception as e:
+                logger.warning("Failed to close browser session: %s", e)
+            self._browser_session = None
+        if self._openai_http_client is not None:
+            await self._openai_http_client.aclose()
+        self.close()
+    
+    def close(self) -> None:
+        """
+        Release the resources that do not belong to an event loop: the scraper
+        thread pool and any Selenium browsers. aclose() also does this.
+        """
+        self._executor.shutdown(wait=False)
+        self.scraper.close()
+    
+    async def _get_browser_session(self):
+        """
+        Return the session owning the shared browser, launching it on first use.
+        The browser is launched without a user data dir so it can hold several
+        independent contexts.
+        """
+        async with self._browser_session_lock:
+            if self._browser_session is None:
+                from browser_use import BrowserSession, BrowserProfile
+                session = BrowserSession(browser_profile=BrowserProfile(
+                    headless=True,
+                    keep_alive=True,
+                    user_data_dir=None,
+                    args=['--disable-dev-shm-usage']
+                ))
+                await session.start()
+                self._browser_session = session
+            return self._browser_session
+    
+    @contextlib.asynccontextmanager
+    async def _agent_browser_session(self):
+        """
+        Yield a browser-use session backed by a fresh context in the shared browser,
+        so concurrent agents never share tabs. The context is closed afterwards.
+        """
+        async with self._browser_context_semaphore:
+            from browser_use import BrowserSession
+            shared = await self._get_browser_session()
+            context = await shared.browser.new_context(
+                **shared.browser_profile.kwargs_for_new_context().model_dump(mode='json')
+            )
+            try:
+                if BLOCK_HEAVY_RESOURCES:
+                    await context.route("**/*", _block_heavy_resources)
+                yield BrowserSession(browser_context=context, browser_profile=shared.browser_profile)
+            finally:
+                await context.close()
+    
     def is_natural_language_request(self, request: str) -> bool:
         """
         Determine if the request is natural language or a direct URL.
         """
-        # Check if it looks like a URL
-        url_patterns = [
-            r'^https?://',
-            r'^www\.',
-            r'^[a-zA-Z0-9-]+\.(com|org|net|edu|io|co|dev)$'
-        ]
-        
-        for pattern in url_patterns:
-            if re.search(pattern, request.strip()):
-                return False
-        
-        # Check for natural language indicators
-        nl_indicators = [
-            'go to', 'visit', 'scrape', 'find', 'search', 'get', 'extract',
-            'second', 'third', 'first', 'last', 'post', 'article', 'page'
-        ]
-        
-        request_lower = request.lower()
-        return any(indicator in request_lower for indicator in nl_indicators)
+        return _is_natural_language(request.strip())
     
     def is_crawl_request(self, request: str) -> bool:
         """
         Determine if the request is a crawl command.
         """
-        request_lower = request.lower().strip()
-        return request_lower.startswith('crawl ')
+        return _parse_crawl(request)[0]
     
     def extract_url_from_crawl_request(self, request: str) -> Optional[str]:
         """
         Extract URL from a crawl request like "crawl https://example.com".
         """
-        request_lower = request.lower().strip()
-        if request_lower.startswith('crawl '):
-            url_part = request[6:].strip()  # Remove "crawl " prefix
-            # Check if it's a valid URL
-            if url_part.startswith(('http://', 'https://', 'www.')):
-                return url_part
-        return None
+        return _parse_crawl(request)[1]
     
     async def process_request(self, request: str, max_items: int = 10) -> Dict[str, Any]:
         """
         Process either a direct URL or natural language request.
         """
-        if self.is_natural_language_request(request):
+        # Strip once and classify with the shared helpers instead of re-normalizing per check
+        stripped = request.strip()
+        # Fast path for the common case: URL prefixes rule out the NL and crawl checks
+        if stripped.startswith(_URL_PREFIXES):
+            return await self.handle_intelligent_url_processing(request, max_items)
+        if _is_natural_language(stripped):
             return await self.handle_natural_language_request(request, max_items)
-        elif self.is_crawl_request(request):
+        elif _parse_crawl(stripped)[0]:
             return await self.handle_crawl_request(request)
         else:
             # Check if it's a URL and use intelligent decision making
-            if self._is_url(request):
+            if _looks_like_url(stripped):
                 return await self.handle_intelligent_url_processing(request, max_items)
             else:
                 return await self.handle_direct_url(request, max_items)
     
+    async def process_requests(self, requests: List[str], max_items: int = 10,
+                               concurrency: int = SCRAPER_CONCURRENCY, batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Process a batch of requests concurrently. Results are returned in input
+        order; a request that raises yields an error result instead of aborting the batch.
+        Large inputs are gathered batch_size at a time so the event loop never
+        holds more pending tasks than that.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _process(request: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_request(request, max_items)
+        
+        results = []
+        for start in range(0, len(requests), batch_size):
+            batch = requests[start:start + batch_size]
+            results.extend(await asyncio.gather(*(_process(request) for request in batch), return_exceptions=True))
+        
+        return [
+            {"error": str(result), "items": []} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking call on the scraper's thread pool without stalling the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
     def _is_url(self, text: str) -> bool:
         """
         Check if the text looks like a URL.
         """
-        url_patterns = [
-            r'^https?://',
-            r'^www\.',
-            r'^[a-zA-Z0-9-]+\.(com|org|net|edu|io|co|dev)$'
-        ]
-        
-        for pattern in url_patterns:
-            if re.search(pattern, text.strip()):
-                return True
-        return False
+        return _looks_like_url(text.strip())
     
     async def handle_direct_url(self, url: str, max_items: int = 10) -> Dict[str, Any]:
         """
         Handle direct URL scraping using existing scraper.
         """
-        logger.info(f"Processing direct URL: {url}")
+        logger.info("Processing direct URL: %s", url)
         
         try:
             # Determine if it's a blog, PDF, or individual page
-            if url.endswith('.pdf') or 'pdf' in url.lower():
-                items = self.scraper.scrape_pdf(url)
+            if _is_pdf_path(url):
+                loop = asyncio.get_running_loop()
+                items = await loop.run_in_executor(_get_pdf_pool(), _extract_pdf, url)
             elif self._is_likely_blog(url):
-                items = self.scraper.scrape_blog(url, max_posts=max_items)
+                items = await self._run_blocking(self.scraper.scrape_blog, url, max_items)
             else:
-                items = self.scraper.scrape_urls([url])
+                items = await self._run_blocking(self.scraper.scrape_urls, [url])
             
             return self.scraper.export_to_knowledgebase_format(items)
             
         except Exception as e:
-            logger.error(f"Error processing direct URL {url}: {e}")
+            logger.error("Error processing direct URL %s: %s", url, e)
             return {"error": str(e), "items": []}
     
+    async def handle_direct_urls(self, urls: List[str], max_items: int = 10, concurrency: int = SCRAPER_CONCURRENCY) -> Dict[str, Any]:
+        """
+        Handle a batch of direct URLs concurrently and merge the results.
+        """
+        # Repeated URLs would only be fetched again and merged as duplicate items
+        urls = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _handle(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.handle_direct_url(url, max_items)
+        
+        results = await asyncio.gather(*(_handle(url) for url in urls))
+        
+        items = []
+        errors = []
+        for url, result in zip(urls, results):
+            items.extend(result.get("items", []))
+            if "error" in result:
+                errors.append(f"{url}: {result['error']}")
+        
+        merged = {"team_id": self.team_id, "items": items}
+        if errors and not items:
+            merged["error"] = "; ".join(errors)
+        return merged
+    
     async def handle_natural_language_request(self, request: str, max_items: int = 10) -> Dict[str, Any]:
         """
         Handle natural language requests using browser-use.
@@ -213,45 +743,102 @@ class IntelligentScraper:
                 "items": []
             }
         
-        logger.info(f"Processing natural language request: {request}")
+        logger.info("Processing natural language request: %s", request)
+        
+        # Key on the full task sent to the agent so prompt template changes invalidate entries
+        cache_key = make_cache_key(
+            "nl", BROWSER_AGENT_MODEL, EXTRACTION_PROMPT_VERSION, self.team_id,
+            self._enhance_task_description(_normalize_request_case(request), max_items)
+        )
+        # The cache reads and writes files, so keep it off the event loop
+        cached = await asyncio.to_thread(self.nl_cache.get, cache_key)
+        if cached is not None:
+            logger.info("Returning cached result for natural language request")
+            return cached
+        
+        # Fall back to a similar earlier request with the same settings; the paid
+        # embedding call is skipped while there is nothing to compare against
+        scope = _semantic_scope(self.team_id, request, max_items)
+        embedding = None
+        if scope in self.semantic_cache:
+            embedding = await self._embed_request(request)
+        if embedding is not None:
+            similar_key = self.semantic_cache.lookup(embedding, scope=scope)
+            cached = await asyncio.to_thread(self.nl_cache.get, similar_key) if similar_key else None
+            if cached is not None:
+                logger.info("Returning cached result for similar natural language request")
+                return cached
         
         try:
             # Create browser agent with enhanced task description
             enhanced_task = self._enhance_task_description(request, max_items)
             
-            agent = Agent(
-                task=enhanced_task,
-                llm=self.browser_agent,
-            )
-            
-            # Run the agent
-            result = await agent.run()
+            # Reuse one browser across requests instead of launching one per agent
+            from browser_use import Agent
+            async with self._agent_browser_session() as browser_session:
+                agent = Agent(
+                    task=enhanced_task,
+                    llm=self.browser_agent,
+                    browser_session=browser_session,
+                )
+                
+                # Run the agent
+                result = await agent.run()
             
             # Parse the result and convert to knowledgebase format
-            return self._parse_browser_result(result, request)
+            parsed = self._parse_browser_result(result, request)
+            if await asyncio.to_thread(self.nl_cache.put, cache_key, parsed):
+                if embedding is None:
+                    embedding = await self._embed_request(request)
+                if embedding is not None:
+                    self.semantic_cache.add(embedding, cache_key, scope=scope)
+            return parsed
             
         except Exception as e:
-            logger.error(f"Error processing natural language request: {e}")
+            logger.error("Error processing natural language request: %s", e)
             return {"error": str(e), "items": []}
     
+    async def _embed_request(self, request: str) -> Optional[List[float]]:
+        """
+        Embed a request for the semantic cache, or return None if embeddings are unavailable.
+        """
+        if not NUMPY_AVAILABLE or not self.openai_client:
+            return None
+        
+        try:
+            response = await self.openai_client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=request.strip()
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning("Failed to embed request for semantic cache: %s", e)
+            return None
+    
     async def handle_crawl_request(self, request: str) -> Dict[str, Any]:
         """
         Handle crawl requests using Firecrawl.
         """
-        if not FIRECRAWL_AVAILABLE or not self.firecrawl_app:
+        url = self.extract_url_from_crawl_request(request)
+        if not url:
             return {
-                "error": "Firecrawl not available. Install with: pip install firecrawl-py and set FIRECRAWL_API_KEY",
+                "error": "Invalid crawl request. Use format: 'crawl https://example.com'",
                 "items": []
             }
         
-        url = self.extract_url_from_crawl_request(request)
-        if not url:
+        return await self._do_crawl(url)
+    
+    async def _do_crawl(self, url: str) -> Dict[str, Any]:
+        """
+        Crawl an already-validated URL with Firecrawl.
+        """
+        if not FIRECRAWL_AVAILABLE or not self.firecrawl_app:
             return {
-                "error": "Invalid crawl request. Use format: 'crawl https://example.com'",
+                "error": "Firecrawl not available. Install with: pip install firecrawl-py and set FIRECRAWL_API_KEY",
                 "items": []
             }
         
-        logger.info(f"Processing crawl request for: {url}")
+        logger.info("Processing crawl request for: %s", url)
         
         try:
             # Use hardcoded limit of 5 as requested
@@ -264,29 +851,21 @@ class IntelligentScraper:
                 )
             )
             
-            # Parse the response and convert to knowledgebase format
-            return self._parse_firecrawl_result(response, url)
+            # Parse the response and convert to knowledgebase format; this also writes
+            # the crawl archive to disk, so keep it off the event loop
+            return await self._run_blocking(self._parse_firecrawl_result, response, url)
             
         except Exception as e:
-            logger.error(f"Error processing crawl request for {url}: {e}")
+            logger.error("Error processing crawl request for %s: %s", url, e)
             return {"error": str(e), "items": []}
     
     def _enhance_task_description(self, request: str, max_items: int) -> str:
         """
         Enhance the natural language request with specific instructions.
         """
-        base_task = f"""
-        {request}
-        
-        Additional requirements:
-        - Extract the content in a structured format
-        - Include title, content, author if available
-        - Convert content to clean markdown format
-        - Limit to {max_items} items maximum
-        - Return the data in a format that can be parsed as JSON
-        """
-        
-        return base_task.strip()
+        # The fixed instructions come first so the prompt prefix is identical across
+        # requests and can be served from the provider's prompt cache
+        return f"{_TASK_INSTRUCTIONS}\n- Limit to {max_items} items maximum\n\nTask: {request}"
     
     def _parse_browser_result(self, result: Any, original_request: str) -> Dict[str, Any]:
         """
@@ -300,29 +879,22 @@ class IntelligentScraper:
                 content = str(result)
             
             # Look for JSON-like content
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group())
-                    return self._convert_to_knowledgebase_format(data, original_request)
-                except json.JSONDecodeError:
-                    pass
+            data = _find_json_object(content)
+            if data is not None:
+                return self._convert_to_knowledgebase_format(data, original_request)
             
             # Fallback: create a single item from the content
             return {
                 "team_id": self.team_id,
-                "items": [{
-                    "title": self._extract_meaningful_title(content, original_request),
-                    "content": content,
-                    "content_type": "web_page",
-                    "source_url": f"request://{original_request}",
-                    "author": "",
-                    "user_id": ""
-                }]
+                "items": [_kb_item(
+                    self._extract_meaningful_title(content, original_request),
+                    content,
+                    f"request://{original_request}"
+                )]
             }
             
         except Exception as e:
-            logger.error(f"Error parsing browser result: {e}")
+            logger.error("Error parsing browser result: %s", e)
             return {"error": str(e), "items": []}
     
     def _parse_firecrawl_result(self, response: Any, original_url: str) -> Dict[str, Any]:
@@ -332,37 +904,34 @@ class IntelligentScraper:
         try:
             items = []
             
-            # Check if response has data
-            if hasattr(response, 'data') and response.data:
-                for item in response.data:
-                    if hasattr(item, 'markdown') and item.markdown:
-                        items.append({
-                            "title": self._extract_title_from_markdown(item.markdown) or f"Page from {original_url}",
-                            "content": item.markdown,
-                            "content_type": "web_page",
-                            "source_url": getattr(item, 'url', original_url),
-                            "author": "",
-                            "user_id": ""
-                        })
+            # Check if response has data; getattr with a default avoids hasattr's exception probe
+            for item in getattr(response, 'data', None) or ():
+                markdown = getattr(item, 'markdown', None)
+                if markdown:
+                    items.append(_kb_item(
+                        self._extract_title_from_markdown(markdown) or f"Page from {original_url}",
+                        markdown,
+                        getattr(item, 'url', original_url)
+                    ))
             
             # Generate unique ID for the output file
             import time
             timestamp = int(time.time())
             
-            # Create the correct structure - each item as a separate object in the array
-            output_data = []
-            for item in items:
-                output_data.append({
-                    "team_id": self.team_id,
-                    "items": [item]  # Each item gets its own object with team_id and items array
-                })
-            
-            # Save to JSON file
+            # Save to JSON file, streaming one object per item so the whole
+            # archive is never held in memory as a single encoded buffer
+            team_id = self.team_id
             output_filename = f"scraped_data_{timestamp}.json"
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            with open(output_filename, 'wb') as f:
+                f.write(b'[')
+                for index, item in enumerate(items):
+                    if index:
+                        f.write(b',')
+                    # Each item gets its own object with team_id and items array
+                    f.write(b'\n' + orjson.dumps({"team_id": team_id, "items": [item]}, option=orjson.OPT_INDENT_2))
+                f.write(b'\n]\n')
             
-            logger.info(f"Crawl results saved to {output_filename}")
+            logger.info("Crawl results saved to %s", output_filename)
             
             # Return the first item for compatibility with existing code
             return {
@@ -371,21 +940,16 @@ class IntelligentScraper:
             }
             
         except Exception as e:
-            logger.error(f"Error parsing Firecrawl result: {e}")
+            logger.error("Error parsing Firecrawl result: %s", e)
             return {"error": str(e), "items": []}
     
     def _extract_title_from_markdown(self, markdown_content: str) -> Optional[str]:
         """
         Extract title from markdown content.
         """
-        lines = markdown_content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('# '):
-                return line[2:].strip()
-            elif line.startswith('## '):
-                return line[3:].strip()
-        return None
+        # Searching in place stops at the first header instead of splitting the whole page
+        match = _MD_TITLE_RE.search(markdown_content)
+        return match.group(1).strip() if match else None
     
     def _extract_meaningful_title(self, content: str, original_request: str) -> str:
         """
@@ -404,33 +968,21 @@ class IntelligentScraper:
         Extract meaningful title from content using various strategies.
         """
         # Strategy 1: Look for markdown headers
-        header_patterns = [
-            r'^#\s+(.+)$',  # # Title
-            r'^##\s+(.+)$',  # ## Title
-            r'^###\s+(.+)$',  # ### Title
-            r'<h1[^>]*>(.+?)</h1>',  # <h1>Title</h1>
-            r'<h2[^>]*>(.+?)</h2>',  # <h2>Title</h2>
-        ]
-        
-        lines = content.split('\n')
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            for pattern in header_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    title = match.group(1).strip()
-                    if len(title) > 5 and len(title) < 200:  # Reasonable length
-                        return self._clean_title(title)
+        # Only the first 20 lines, within the scan window, are ever inspected, so don't
+        # split the rest of the content
+        head = content[:_TITLE_SCAN_CHARS]
+        lines = head.split('\n', 20)
+        # Drop the unsplit remainder, or a last line cut off by the window
+        if len(lines) > 20 or len(head) < len(content):
+            lines.pop()
+        for match in _HEADER_RE.finditer('\n'.join(lines[:10])):  # Check first 10 lines
+            title = (match.group('md') or match.group('html')).strip()
+            if len(title) > 5 and len(title) < 200:  # Reasonable length
+                return self._clean_title(title)
         
         # Strategy 2: Look for JSON-like structures with title
-        json_patterns = [
-            r'"title"\s*:\s*"([^"]+)"',
-            r'"name"\s*:\s*"([^"]+)"',
-            r'"heading"\s*:\s*"([^"]+)"',
-        ]
-        
-        for pattern in json_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in _JSON_TITLE_PATTERNS:
+            match = pattern.search(head)
             if match:
                 title = match.group(1).strip()
                 if len(title) > 5 and len(title) < 200:
@@ -455,79 +1007,13 @@ class IntelligentScraper:
         """
         Create a meaningful title from the original request.
         """
-        # Remove common prefixes
-        request_lower = request.lower()
-        
-        # Extract key information from request
-        if 'reddit' in request_lower:
-            # Extract subreddit name
-            subreddit_match = re.search(r'r/([a-zA-Z0-9_]+)', request_lower)
-            if subreddit_match:
-                subreddit = subreddit_match.group(1)
-                return f"Top Posts from r/{subreddit}"
-        
-        elif 'quora' in request_lower:
-            # Extract topic - look for words after "quora" and before "and" or end
-            topic_match = re.search(r'quora\s+([^a]+?)(?:\s+and|\s*$)', request_lower)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                return f"Quora: {topic.title()}"
-        
-        elif 'medium' in request_lower:
-            # Extract search terms - look for words after "for" and before end
-            search_match = re.search(r'search.*?for\s+([^a]+?)(?:\s*$)', request_lower)
-            if search_match:
-                search_terms = search_match.group(1).strip()
-                return f"Medium Articles: {search_terms.title()}"
-        
-        elif 'wikipedia' in request_lower:
-            # Extract search terms - look for words after "for" and before end
-            search_match = re.search(r'wikipedia.*?for\s+([^a]+?)(?:\s*$)', request_lower)
-            if search_match:
-                search_terms = search_match.group(1).strip()
-                return f"Wikipedia: {search_terms.title()}"
-        
-        elif 'stack overflow' in request_lower or 'stackoverflow' in request_lower:
-            return "Stack Overflow Questions"
-        
-        elif 'hacker news' in request_lower or 'hn' in request_lower:
-            return "Hacker News Top Stories"
-        
-        # Generic fallback
-        words = request.split()
-        if len(words) > 3:
-            # Take first few meaningful words
-            meaningful_words = [w for w in words[:6] if len(w) > 2 and w.lower() not in ['go', 'to', 'and', 'get', 'the', 'top', 'posts', 'from', 'for', 'about']]
-            if meaningful_words:
-                return f"{' '.join(meaningful_words[:4]).title()}"
-        
-        # Last resort: clean up the original request
-        return self._clean_title(request)
+        return _title_from_request(request)
     
     def _clean_title(self, title: str) -> str:
         """
         Clean and format a title.
         """
-        # Remove extra whitespace
-        title = re.sub(r'\s+', ' ', title.strip())
-        
-        # Remove markdown formatting
-        title = re.sub(r'[*_`#]', '', title)
-        
-        # Remove HTML tags
-        title = re.sub(r'<[^>]+>', '', title)
-        
-        # Remove URLs
-        title = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', title)
-        
-        # Capitalize first letter of each word (title case)
-        title = title.title()
-        
-        # Limit length
-        if len(title) > 100:
-            title = title[:97] + "..."
-        
-        return title.strip()
+        return _clean_title(title)
     
     def _convert_to_knowledgebase_format(self, data: Dict[str, Any], original_request: str) -> Dict[str, Any]:
         """
@@ -551,68 +1037,46 @@ class IntelligentScraper:
             items = data
         
         # Convert items to knowledgebase format
-        knowledgebase_items = []
-        for item in items:
-            if isinstance(item, dict):
-                # Extract and clean title
-                raw_title = item.get('title', '')
-                if raw_title:
-                    title = self._clean_title(raw_title)
-                else:
-                    # If no title in item, try to extract from content
-                    content = item.get('content', str(item))
-                    title = self._extract_meaningful_title(content, original_request)
-                
-                knowledgebase_items.append({
-                    "title": title,
-                    "content": item.get('content', str(item)),
-                    "content_type": item.get('content_type', 'web_page'),
-                    "source_url": item.get('source_url', f"request://{original_request}"),
-                    "author": item.get('author', ''),
-                    "user_id": ""
-                })
+        default_source_url = f"request://{original_request}"
+        convert = self._convert_item
+        knowledgebase_items = [
+            convert(item, original_request, default_source_url)
+            for item in items if isinstance(item, dict)
+        ]
         
         return {
             "team_id": self.team_id,
             "items": knowledgebase_items
         }
     
-    def _is_likely_blog(self, url: str) -> bool:
+    def _convert_item(self, item: Dict[str, Any], original_request: str, default_source_url: str) -> Dict[str, Any]:
         """
-        Determine if a URL is likely a blog homepage (not an individual blog post).
+        Convert a single parsed item to a knowledgebase item.
         """
-        # Check if it's likely an individual blog post (has specific post identifiers)
-        post_indicators = [
-            '/blog/', '/posts/', '/articles/', '/news/',  # Common blog post paths
-            '/202', '/2023/', '/2024/', '/2025/',  # Year-based posts
-            '/jan/', '/feb/', '/mar/', '/apr/', '/may/', '/jun/',  # Month-based posts
-            '/jul/', '/aug/', '/sep/', '/oct/', '/nov/', '/dec/',
-            'post-', 'article-', 'blog-',  # Post identifiers
-            '.html', '.php', '.aspx'  # File extensions
-        ]
-        
-        url_lower = url.lower()
+        get = item.get
+        content = item['content'] if 'content' in item else str(item)
         
-        # If URL contains post indicators, it's likely an individual post
-        for indicator in post_indicators:
-            if indicator in url_lower:
-                return False
-        
-        # Check if it's likely a blog homepage
-        blog_homepage_indicators = [
-            '/blog$', '/posts$', '/articles$', '/news$',  # Ends with blog paths
-            'medium.com', 'substack.com', 'wordpress.com'  # Known blog platforms
-        ]
-        
-        for indicator in blog_homepage_indicators:
-            if indicator.endswith('$'):
-                # Use regex for end-of-string matching
-                if re.search(indicator, url_lower):
-                    return True
-            elif indicator in url_lower:
-                return True
+        # Extract and clean title
+        raw_title = get('title', '')
+        if raw_title:
+            title = _clean_title(raw_title)
+        else:
+            # If no title in item, try to extract from content
+            title = self._extract_meaningful_title(content, original_request)
         
-        return False
+        return _kb_item(
+            title,
+            content,
+            get('source_url', default_source_url),
+            content_type=get('content_type', 'web_page'),
+            author=get('author', '')
+        )
+    
+    def _is_likely_blog(self, url: str) -> bool:
+        """
+        Determine if a URL is likely a blog homepage (not an individual blog post).
+        """
+        return _is_blog_homepage(url)
     
     async def intelligently_decide_scraping_strategy(self, url: str) -> str:
         """
@@ -623,6 +1087,14 @@ class IntelligentScraper:
             # Fallback to simple heuristics
             return self._fallback_scraping_decision(url)
         
+        # URLs of the same shape get the same answer, so only the first one pays for the LLM call
+        signature = _url_signature(url)
+        cached = self._decision_cache.get(signature)
+        if cached is not None:
+            self._decision_cache.move_to_end(signature)
+            logger.info("Cached decision for %s: %s", url, cached)
+            return cached
+        
         try:
             # Create a more specific prompt for the o1-mini model
             decision_prompt = f"""
@@ -654,7 +1126,7 @@ class IntelligentScraper:
             """
             
             # Call o1-mini for intelligent decision (fixed parameter)
-            response = self.openai_client.chat.completions.create(
+            response = await self.openai_client.chat.completions.create(
                 model="o1-mini",
                 messages=[
                     {"role": "user", "content": decision_prompt}
@@ -667,14 +1139,17 @@ class IntelligentScraper:
             
             # Validate the response
             if decision in ['scrape', 'crawl']:
-                logger.info(f"Intelligent decision for {url}: {decision}")
+                logger.info("Intelligent decision for %s: %s", url, decision)
+                self._decision_cache[signature] = decision
+                if len(self._decision_cache) > DECISION_CACHE_SIZE:
+                    self._decision_cache.popitem(last=False)
                 return decision
             else:
-                logger.warning(f"Invalid decision from o1-mini: {decision}, using fallback")
+                logger.warning("Invalid decision from o1-mini: %s, using fallback", decision)
                 return self._fallback_scraping_decision(url)
                 
         except Exception as e:
-            logger.error(f"Error in intelligent decision making: {e}")
+            logger.error("Error in intelligent decision making: %s", e)
             return self._fallback_scraping_decision(url)
     
     def _fallback_scraping_decision(self, url: str) -> str:
@@ -683,70 +1158,99 @@ class IntelligentScraper:
         """
         url_lower = url.lower()
         
-        # Patterns that suggest single pages (scrape)
-        single_page_patterns = [
-            '/post/', '/article/', '/entry/', '/story/', '/blog/',
-            '/2024/', '/2023/', '/2022/', '/2021/', '/2020/',
-            '.html', '.php', '.aspx', '.jsp',
-            '/page/', '/single/', '/view/',
-            # Specific title patterns
-            '/how-to-', '/guide-', '/tutorial-', '/learn-',
-            '/getting-started', '/introduction', '/overview'
-        ]
-        
-        # Patterns that suggest collection pages (crawl)
-        collection_patterns = [
-            '/blog$', '/news$', '/docs$', '/articles$',
-            '/category/', '/tag/', '/topic/',
-            '/archive/', '/index$', '/home$',
-            '/search', '/filter', '/browse'
-        ]
-        
         # Check for single page patterns first
-        for pattern in single_page_patterns:
-            if pattern in url_lower:
-                logger.info(f"Fallback decision: scrape (pattern: {pattern})")
-                return "scrape"
+        match = _SINGLE_PAGE_RE.search(url_lower)
+        if match:
+            logger.info("Fallback decision: scrape (pattern: %s)", match.group())
+            return "scrape"
         
         # Check for collection patterns
-        for pattern in collection_patterns:
-            if pattern in url_lower:
-                logger.info(f"Fallback decision: crawl (pattern: {pattern})")
-                return "crawl"
+        match = _COLLECTION_RE.search(url_lower)
+        if match:
+            logger.info("Fallback decision: crawl (pattern: %s)", match.group())
+            return "crawl"
         
         # Count slashes to estimate depth
         slash_count = url.count('/')
         if slash_count >= 4:  # Deep URL, likely single page
-            logger.info(f"Fallback decision: scrape (deep URL with {slash_count} slashes)")
+            logger.info("Fallback decision: scrape (deep URL with %s slashes)", slash_count)
             return "scrape"
         else:  # Shallow URL, likely collection
-            logger.info(f"Fallback decision: crawl (shallow URL with {slash_count} slashes)")
+            logger.info("Fallback decision: crawl (shallow URL with %s slashes)", slash_count)
             return "crawl"
     
     async def handle_intelligent_url_processing(self, url: str, max_items: int = 10) -> Dict[str, Any]:
         """
         Intelligently decide whether to scrape or crawl a URL using o1-mini.
         """
-        logger.info(f"Intelligently processing URL: {url}")
+        logger.info("Intelligently processing URL: %s", url)
         
         try:
             # Use o1-mini to decide the best strategy
             strategy = await self.intelligently_decide_scraping_strategy(url)
             
             if strategy == 'crawl':
-                logger.info(f"Intelligent decision: crawling {url}")
-                crawl_request = f"crawl {url}"
-                return await self.handle_crawl_request(crawl_request)
+                logger.info("Intelligent decision: crawling %s", url)
+                return await self._do_crawl(url)
             else:
-                logger.info(f"Intelligent decision: scraping {url}")
+                logger.info("Intelligent decision: scraping %s", url)
                 return await self.handle_direct_url(url, max_items)
                 
         except Exception as e:
-            logger.error(f"Error in intelligent URL processing: {e}")
+            logger.error("Error in intelligent URL processing: %s", e)
             # Fallback to direct URL handling
             return await self.handle_direct_url(url, max_items)
 
 # --- CLI Interface ---
+async def _ainput(prompt: str) -> str:
+    """
+    Read a line in a worker thread so the event loop keeps running while the user types.
+    """
+    return await asyncio.to_thread(input, prompt)
+
+async def _append_result(output_file: Path, result: Dict[str, Any]) -> None:
+    """
+    Append a result to the newline-delimited JSON archive without blocking the event loop.
+    Appending costs only the new record, however large the archive has grown.
+    """
+    async with aiofiles.open(output_file, 'ab') as f:
+        await f.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+
+async def _result_writer(queue: "asyncio.Queue[Tuple[Path, Dict[str, Any]]]") -> None:
+    """
+    Persist queued results in the background so the next prompt appears without
+    waiting for the previous write.
+    """
+    while True:
+        output_file, result = await queue.get()
+        try:
+            await _append_result(output_file, result)
+        except Exception as e:
+            # One bad result must not stop the writer, or join() at exit never returns
+            logger.error("Failed to save result to %s: %s", output_file, e)
+        finally:
+            queue.task_done()
+
+def consolidate_results(ndjson_file: Path, output_file: Optional[Path] = None) -> Path:
+    """
+    Stream a newline-delimited JSON archive into a single JSON array file.
+    Records are copied line by line without being decoded, so memory stays flat.
+    """
+    ndjson_file = Path(ndjson_file)
+    output_file = Path(output_file) if output_file else ndjson_file.with_suffix('.json')
+    with open(ndjson_file, 'rb') as src, open(output_file, 'wb') as dst:
+        dst.write(b'[')
+        first = True
+        for line in src:
+            line = line.strip()
+            if not line:
+                continue
+            dst.write(b'\n' if first else b',\n')
+            dst.write(line)
+            first = False
+        dst.write(b'\n]\n')
+    return output_file
+
 async def main():
     """
     Interactive CLI for the intelligent scraper.
@@ -765,7 +1269,7 @@ async def main():
     print("Type 'exit' to quit.")
     
     # Get configuration
-    team_id = input("\nTeam ID (default: test_team): ").strip() or "test_team"
+    team_id = (await _ainput("\nTeam ID (default: test_team): ")).strip() or "test_team"
     
     # Check for browser-use and API key
     if not BROWSER_USE_AVAILABLE:
@@ -774,18 +1278,22 @@ async def main():
         llm_api_key = None
     else:
         # Check if API key is available in environment
-        env_api_key = os.getenv("OPENAI_API_KEY")
-        if env_api_key:
+        if OPENAI_API_KEY:
             print(f"\n✅ Found OpenAI API key in environment")
             llm_api_key = None  # Will be loaded automatically
         else:
             print(f"\n⚠️  No OpenAI API key found in environment (.env file)")
             print("   Create a .env file with: OPENAI_API_KEY=your-key-here")
-            llm_api_key = input("   Or enter API key manually (optional): ").strip() or None
-    
-    # Initialize scraper
-    scraper = IntelligentScraper(team_id, llm_api_key=llm_api_key)
+            llm_api_key = (await _ainput("   Or enter API key manually (optional): ")).strip() or None
     
+    # Initialize scraper; closing it also shuts down the shared browser
+    async with IntelligentScraper(team_id, llm_api_key=llm_api_key) as scraper:
+        await _run_cli(scraper, team_id)
+
+async def _run_cli(scraper: IntelligentScraper, team_id: str):
+    """
+    Show scraper status and run the interactive request loop.
+    """
     # Show status
     if BROWSER_USE_AVAILABLE and scraper.browser_agent:
         print(f"\n✅ Natural language requests: ENABLED")
@@ -796,56 +1304,75 @@ async def main():
     
     print(f"✅ Direct URL scraping: ENABLED")
     
-    while True:
-        try:
-            request = input("\n🤖 Your request: ").strip()
-            
-            if request.lower() in ['exit', 'quit']:
-                print("Goodbye!")
-                break
-            
-            if not request:
-                continue
-            
-            print(f"\n🚀 Processing: {request}")
-            
-            # Process the request
-            result = await scraper.process_request(request)
-            
-            if "error" in result:
-                print(f"\n❌ Error: {result['error']}")
-            else:
-                print(f"\n✅ Success! Extracted {len(result.get('items', []))} items")
+    # Results are written by a background task; pending writes are flushed before returning
+    write_queue: "asyncio.Queue[Tuple[Path, Dict[str, Any]]]" = asyncio.Queue()
+    writer = asyncio.create_task(_result_writer(write_queue))
+    
+    try:
+        while True:
+            try:
+                request = (await _ainput("\n🤖 Your request: ")).strip()
                 
-                # Append to file instead of overwriting
-                output_file = f"scraped_data_{team_id}.json"
-                if os.path.exists(output_file):
-                    with open(output_file, 'r') as f:
-                        try:
-                            all_results = json.load(f)
-                        except Exception:
-                            all_results = []
-                else:
-                    all_results = []
-                all_results.append(result)
-                with open(output_file, 'w') as f:
-                    json.dump(all_results, f, indent=2)
+                if request.lower() in ['exit', 'quit']:
+                    stats = scraper.nl_cache.stats()
+                    print(f"📊 NL cache: {stats['hits']} hits, {stats['misses']} misses")
+                    print("Goodbye!")
+                    break
+                
+                if not request:
+                    continue
                 
-                print(f"📄 Appended to: {output_file}")
+                print(f"\n🚀 Processing: {request}")
                 
-                # Show sample
-                if result.get('items'):
+                # Process the request
+                result = await scraper.process_request(request)
+                
+                if "error" in result:
+                    print(f"\n❌ Error: {result['error']}")
+                else:
+                    print(f"\n✅ Success! Extracted {len(result.get('items', []))} items")
+                    
+                    # Empty results have nothing worth archiving, so skip the write entirely
+                    if not result.get('items'):
+                        print("⚠️ No items — nothing persisted")
+                        continue
+                    
+                    # Append to file instead of overwriting
+                    output_file = Path(f"scraped_data_{team_id}.ndjson")
+                    write_queue.put_nowait((output_file, result))
+                    
+                    print(f"📄 Appending to: {output_file}")
+                    
+                    # Show sample
                     sample = result['items'][0]
                     print(f"\n📝 Sample item:")
                     print(f"   Title: {sample['title'][:50]}...")
                     print(f"   Content Length: {len(sample['content'])} characters")
                     print(f"   Type: {sample['content_type']}")
-        
-        except KeyboardInterrupt:
-            print("\n\n👋 Scraping cancelled by user")
-            break
-        except Exception as e:
-            print(f"\n❌ Unexpected error: {e}")
+            
+            except KeyboardInterrupt:
+                print("\n\n👋 Scraping cancelled by user")
+                break
+            except Exception as e:
+                print(f"\n❌ Unexpected error: {e}")
+    finally:
+        if not writer.done():
+            await write_queue.join()
+        writer.cancel()
+
+@click.command()
+@click.option('--consolidate', 'ndjson_file', type=click.Path(exists=True, dir_okay=False),
+              help='Convert an NDJSON results archive into a JSON array file and exit')
+def cli(ndjson_file):
+    """Intelligent THT Scraper - interactive natural language and URL scraping."""
+    if ndjson_file:
+        output_file = consolidate_results(Path(ndjson_file))
+        print(f"📄 Consolidated {ndjson_file} into {output_file}")
+        return
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    cli() 
\ No newline at end of file
@@ -1,24 +1,56 @@
 import os
-import json
+import functools
+import logging
+import orjson
 import openai
 import requests
 import re
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
 from scraper import THTScraper
 
+logger = logging.getLogger(__name__)
+
+# Shared session so repeated Drive downloads reuse the HTTPS connection
+_SESSION = requests.Session()
+
+# Read once at import; checked when the OpenAI client is first needed
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+# File ID in Drive share links like https://drive.google.com/file/d/FILE_ID/view
+_DRIVE_ID_RE = re.compile(r'/file/d/([a-zA-Z0-9\-_]+)')
+
+# Upper bound on parallel page fetches in scrape_urls
+URL_SCRAPE_CONCURRENCY = 16
+
 # --- Tool Wrappers ---
+@functools.lru_cache(maxsize=32)
+def _get_scraper(team_id: str, use_selenium: bool = False) -> THTScraper:
+    """Return a shared scraper for this configuration so its HTTP sessions are reused across tool calls."""
+    return THTScraper(team_id, use_selenium=use_selenium)
+
 def scrape_blog(team_id: str, blog_url: str, max_posts: int = 50, use_selenium: bool = False):
-    scraper = THTScraper(team_id, use_selenium=use_selenium)
+    scraper = _get_scraper(team_id, use_selenium)
     items = scraper.scrape_blog(blog_url, max_posts=max_posts)
     return scraper.export_to_knowledgebase_format(items)
 
 def scrape_pdf(team_id: str, pdf_path: str):
-    scraper = THTScraper(team_id)
+    scraper = _get_scraper(team_id)
     items = scraper.scrape_pdf(pdf_path)
     return scraper.export_to_knowledgebase_format(items)
 
-def scrape_urls(team_id: str, urls: list, use_selenium: bool = False):
-    scraper = THTScraper(team_id, use_selenium=use_selenium)
-    items = scraper.scrape_urls(urls)
+def scrape_pdf_bytes(team_id: str, data: bytes, source_url: str):
+    """Scrape a PDF already held in memory, without writing it to disk."""
+    scraper = _get_scraper(team_id)
+    items = scraper.scrape_pdf(io.BytesIO(data), source_url=source_url)
+    return scraper.export_to_knowledgebase_format(items)
+
+def scrape_urls(team_id: str, urls: list, use_selenium: bool = False, concurrency: int = URL_SCRAPE_CONCURRENCY):
+    scraper = _get_scraper(team_id, use_selenium)
+    # The value can come straight from the model, so keep it within the worker budget
+    concurrency = max(1, min(int(concurrency), URL_SCRAPE_CONCURRENCY))
+    items = scraper.scrape_urls(urls, concurrency=concurrency)
     return scraper.export_to_knowledgebase_format(items)
 
 def scrape_google_drive_pdf(team_id: str, drive_url: str):
@@ -26,39 +58,21 @@ def scrape_google_drive_pdf(team_id: str, drive_url: str):
     print(f"📥 Downloading PDF from Google Drive: {drive_url}")
     
     # Extract file ID from Google Drive URL
-    file_id_match = re.search(r'/file/d/([a-zA-Z0-9-_]+)', drive_url)
+    file_id_match = _DRIVE_ID_RE.search(drive_url)
     if not file_id_match:
         raise ValueError("Could not extract file ID from Google Drive URL")
     
     file_id = file_id_match.group(1)
     download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
     
-    # Download the PDF
-    response = requests.get(download_url, stream=True)
+    # Download the PDF into memory and parse it from there; no temporary file is needed
+    response = _SESSION.get(download_url, timeout=30)
     response.raise_for_status()
     
-    # Save to temporary file
-    temp_filename = f"temp_drive_pdf_{file_id}.pdf"
-    with open(temp_filename, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-    
-    print(f"✅ Downloaded PDF to: {temp_filename}")
+    print(f"✅ Downloaded PDF ({len(response.content)} bytes)")
     
-    try:
-        # Scrape the downloaded PDF
-        result = scrape_pdf(team_id, temp_filename)
-        
-        # Clean up temporary file
-        os.remove(temp_filename)
-        print(f"🧹 Cleaned up temporary file: {temp_filename}")
-        
-        return result
-    except Exception as e:
-        # Clean up on error too
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        raise e
+    # Scrape the downloaded PDF
+    return scrape_pdf_bytes(team_id, response.content, drive_url)
 
 # --- Tool Schemas ---
 openai_tools = [
@@ -119,7 +133,8 @@ openai_tools = [
                 "properties": {
                     "team_id": {"type": "string"},
                     "urls": {"type": "array", "items": {"type": "string"}},
-                    "use_selenium": {"type": "boolean", "default": False}
+                    "use_selenium": {"type": "boolean", "default": False},
+                    "concurrency": {"type": "integer", "default": URL_SCRAPE_CONCURRENCY, "minimum": 1, "maximum": URL_SCRAPE_CONCURRENCY}
                 },
                 "required": ["team_id", "urls"]
             }
@@ -127,17 +142,18 @@ openai_tools = [
     }
 ]
 
+# Tool name -> Python function, used to dispatch the LLM's tool calls
+_TOOLS: Dict[str, Callable] = {
+    "scrape_blog": scrape_blog,
+    "scrape_pdf": scrape_pdf,
+    "scrape_google_drive_pdf": scrape_google_drive_pdf,
+    "scrape_urls": scrape_urls,
+}
+
 # --- LLM Orchestration ---
-def orchestrate_with_llm(user_message, team_id="test_team"):
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY environment variable not set.")
-    
-    client = openai.OpenAI(api_key=api_key)
-    messages = [
-        {
-            "role": "system", 
-            "content": """You are an agent that helps import technical knowledge into a knowledgebase. 
+_SYSTEM_PROMPT = {
+    "role": "system",
+    "content": """You are an agent that helps import technical knowledge into a knowledgebase. 
 You MUST use one of the available tools to fulfill the user's request. Do not respond with text - always call a tool.
 
 - For blog URLs (like https://interviewing.io/blog), use scrape_blog
@@ -146,9 +162,18 @@ You MUST use one of the available tools to fulfill the user's request. Do not re
 - For individual web pages or multiple URLs, use scrape_urls
 
 Always extract the relevant information from the user's request and call the appropriate tool."""
-        },
-        {"role": "user", "content": user_message}
-    ]
+}
+
+@functools.lru_cache(maxsize=1)
+def _get_client() -> openai.OpenAI:
+    """Return the shared OpenAI client, created on first use so its connection pool is reused."""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY environment variable not set.")
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+def orchestrate_with_llm(user_message, team_id="test_team"):
+    client = _get_client()
+    messages = [_SYSTEM_PROMPT, {"role": "user", "content": user_message}]
     
     print(f"🤖 Sending request to GPT-4o: {user_message}")
     
@@ -159,7 +184,7 @@ Always extract the relevant information from the user's request and call the app
         tool_choice="auto"
     )
     
-    print(f"🤖 LLM Response: {response.choices[0].message.content}")
+    logger.debug("LLM response content: %s", response.choices[0].message.content)
     
     # Check if the LLM made a tool call
     if not response.choices[0].message.tool_calls:
@@ -169,35 +194,58 @@ Always extract the relevant information from the user's request and call the app
         print("   - Try being more specific (e.g., 'scrape this blog: https://example.com')")
         return None
     
-    tool_call = response.choices[0].message.tool_calls[0]
-    function_name = tool_call.function.name
-    arguments = json.loads(tool_call.function.arguments)
-    
-    print(f"✅ LLM chose tool: {function_name}")
-    print(f"📋 Arguments: {arguments}")
-
-    # Call the actual Python function
-    try:
-        if function_name == "scrape_blog":
-            result = scrape_blog(**arguments)
-        elif function_name == "scrape_pdf":
-            result = scrape_pdf(**arguments)
-        elif function_name == "scrape_google_drive_pdf":
-            result = scrape_google_drive_pdf(**arguments)
-        elif function_name == "scrape_urls":
-            result = scrape_urls(**arguments)
-        else:
-            raise ValueError(f"Unknown function: {function_name}")
-
-        print(f"✅ Successfully scraped {len(result['items'])} items")
-        print(f"📄 Sample result: {json.dumps(result, indent=2)[:1000]}...\n[truncated]")
-        return result
+    # The model may request several tools at once; run them all in parallel threads
+    calls = []
+    for tool_call in response.choices[0].message.tool_calls:
+        function_name = tool_call.function.name
+        try:
+            arguments = orjson.loads(tool_call.function.arguments)
+            tool = _TOOLS.get(function_name)
+            if tool is None:
+                raise ValueError(f"Unknown function: {function_name}")
+        except Exception as e:
+            print(f"❌ Error running {function_name}: {e}")
+            continue
         
-    except Exception as e:
-        print(f"❌ Error running {function_name}: {e}")
+        print(f"✅ LLM chose tool: {function_name}")
+        logger.debug("Arguments for %s: %s", function_name, arguments)
+        calls.append((function_name, tool, arguments))
+    
+    if not calls:
         return None
+    
+    # Call the actual Python functions
+    results = []
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(tool, **arguments) for _, tool, arguments in calls]
+        for (function_name, _, _), future in zip(calls, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"❌ Error running {function_name}: {e}")
+    
+    if not results:
+        return None
+    
+    # Merge every tool's items into one knowledgebase result
+    result = {
+        "team_id": results[0]["team_id"],
+        "items": [item for tool_result in results for item in tool_result["items"]]
+    }
+    
+    print(f"✅ Successfully scraped {len(result['items'])} items")
+    # The preview serializes the whole result, so only build it when debug logging is on.
+    # Only the first 1000 bytes are shown; a cut multi-byte character is dropped
+    if logger.isEnabledFor(logging.DEBUG):
+        preview = orjson.dumps(result, option=orjson.OPT_INDENT_2)[:1000].decode('utf-8', 'ignore')
+        logger.debug("Sample result: %s...\n[truncated]", preview)
+    return result
 
 if __name__ == "__main__":
+    # SCRAPER_DEBUG=1 shows the LLM response, tool arguments and result preview
+    if os.getenv("SCRAPER_DEBUG"):
+        logger.setLevel(logging.DEBUG)
+    
     print("🚀 THT Scraper with GPT-4o Orchestration")
     print("=" * 50)
     print("Examples:")
@@ -215,8 +263,8 @@ if __name__ == "__main__":
     if result:
         # Save to file
         output_file = f"{team_id}_knowledgebase.json"
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
         print(f"💾 Results saved to: {output_file}")
     else:
         print("❌ No results generated") 
\ No newline at end of file
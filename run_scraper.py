@@ -68,18 +68,16 @@ def get_pdf_path():
     print("\n📄 Step 3: Enter the PDF file path")
     print("   Make sure the PDF file is in the current directory")
     
-    pdf_path = input("\n   PDF file path: ").strip()
-    
-    if not pdf_path:
-        print("   Please provide a valid PDF file path")
-        return get_pdf_path()
-    
-    if not os.path.exists(pdf_path):
-        print(f"   ❌ File not found: {pdf_path}")
-        print("   Please check the file path and try again")
-        return get_pdf_path()
-    
-    return pdf_path
+    while True:
+        pdf_path = input("\n   PDF file path: ").strip()
+        
+        if not pdf_path:
+            print("   Please provide a valid PDF file path")
+        elif not os.path.exists(pdf_path):
+            print(f"   ❌ File not found: {pdf_path}")
+            print("   Please check the file path and try again")
+        else:
+            return pdf_path
 
 def get_urls():
     """Get multiple URLs from user."""
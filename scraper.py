@@ -4,14 +4,25 @@ THT Scraper - A comprehensive web scraper for extracting content from various so
 and formatting it for knowledgebase import.
 """
 
-import json
+import atexit
+import contextlib
+import functools
+import io
+import itertools
+import os
 import re
+import threading
 import time
+import weakref
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from urllib.parse import urljoin, urlparse, parse_qs
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 try:
     import feedparser
@@ -21,11 +32,18 @@ except ImportError:
     logging.warning("feedparser not available - RSS functionality will be limited")
 from newspaper import Article
 import trafilatura
+from trafilatura.utils import load_html
 from readability import Document
 import PyPDF2
 import pypdf
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -34,11 +52,210 @@ from webdriver_manager.chrome import ChromeDriverManager
 from markdownify import markdownify as md
 from tqdm import tqdm
 import click
+from extraction_cache import ExtractionCache, make_cache_key, write_bytes_atomic
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Pages fetched in parallel by BlogExtractor.extract_many
+SCRAPE_CONCURRENCY = 8
+# Requests allowed in flight against any single host
+PER_HOST_CONCURRENCY = 2
+# Requests per second started against any single host
+DEFAULT_PER_HOST_RPS = 1.0
+
+# Headless Chrome instances kept alive for Selenium scraping
+SELENIUM_WORKERS = 4
+# Seconds to wait for a main content element after the page body appears
+SELENIUM_CONTENT_TIMEOUT = 3
+# Seconds a page waits for a pooled driver before giving up
+SELENIUM_ACQUIRE_TIMEOUT = 120
+
+# Extracted pages are reused from the on-disk cache for this long
+PAGE_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Pages per knowledgebase item when splitting PDFs
+PDF_CHUNK_PAGES = 5
+# PDFs with at least this many pages have their text extracted in worker processes
+PDF_PARALLEL_MIN_PAGES = 20
+
+# lxml's C parser is several times faster than the pure-Python html.parser
+HTML_PARSER = 'lxml'
+
+# Paths that are never blog posts; one alternation scans each link once
+_SKIP_URL_RE = re.compile(
+    r'/tag/|/category/|/author/|/page/|/search|/about|/contact|/privacy|/terms|/feed'
+    r'|\.(pdf|doc|docx|jpg|jpeg|png|gif)$',
+    re.IGNORECASE
+)
+_RSS_URL_RE = re.compile(r'\.xml$|/feed|/rss|/atom', re.IGNORECASE)
+
+# Grouped CSS selectors; each is matched in one walk of the tree, in document order
+_CONTENT_SELECTOR = (
+    'article, main, .content, .post-content, .entry-content, '
+    '.article-content, .blog-content, .post-body'
+)
+_AUTHOR_SELECTOR = '.author, .byline, .post-author, .entry-author, [rel="author"], .author-name, .writer'
+_PAGINATION_SELECTOR = '.pagination a, .pager a, .page-numbers a, a[rel="next"], .next a, .prev a'
+# Mount points of client-rendered apps whose HTML carries no content
+_JS_APP_ROOT_SELECTOR = '#root, #app, #__next, #__nuxt, noscript'
+
+_POST_LINK_SELECTOR = (
+    'article a, .post a, .blog-post a, .entry a, '
+    '.post-title a, .entry-title a, h2 a, h3 a'
+)
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def _build_session() -> requests.Session:
+    """Create a session with a connection pool large enough for parallel scraping."""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, pool_block=False, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Shared by every extractor so repeated fetches to a host reuse its connections
+_SESSION = _build_session()
+
+def _markdown_line(line: str) -> str:
+    """Turn a stripped line into a markdown header if it looks like one."""
+    # Simple heuristics for headers
+    if len(line) < 100 and line.isupper():
+        return f"## {line}"
+    if len(line) < 80 and line.endswith(':'):
+        return f"### {line}"
+    return line
+
+def _text_to_markdown(text: str) -> str:
+    """Convert plain text to basic markdown, one paragraph per non-empty line."""
+    # map/filter keep the per-line loop in C; only the header check runs as Python
+    return '\n\n'.join(map(_markdown_line, filter(None, map(str.strip, text.split('\n')))))
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host by at least 1/per_host_rps seconds.
+    Requests to different hosts never wait on each other. Thread-safe.
+    """
+    
+    def __init__(self, per_host_rps: float = DEFAULT_PER_HOST_RPS):
+        self.min_interval = 1.0 / per_host_rps if per_host_rps > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, url: str) -> None:
+        """Block until a request to url's host may start."""
+        if not self.min_interval:
+            return
+        host = urlparse(url).netloc
+        # Reserve the host's next slot under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+@functools.lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Resolve (and download if needed) the chromedriver binary once per process."""
+    return ChromeDriverManager().install()
+
+def _new_chrome_driver() -> webdriver.Chrome:
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    return webdriver.Chrome(service=Service(_chromedriver_path()), options=chrome_options)
+
+# Pools still open at interpreter exit are closed by one hook; a weak set so that
+# registering a pool does not keep it alive after its scraper is gone
+_OPEN_POOLS: "weakref.WeakSet[SeleniumPool]" = weakref.WeakSet()
+
+@atexit.register
+def _close_open_pools() -> None:
+    for pool in list(_OPEN_POOLS):
+        pool.close()
+
+class SeleniumPool:
+    """
+    Pool of reusable headless Chrome drivers. Drivers are started on demand, up to
+    size, and returned to the pool after each page instead of being quit.
+    """
+    
+    def __init__(self, size: int = SELENIUM_WORKERS, acquire_timeout: float = SELENIUM_ACQUIRE_TIMEOUT):
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[webdriver.Chrome] = []
+        self._drivers: List[webdriver.Chrome] = []
+        # Drivers being started outside the lock still count towards size
+        self._starting = 0
+        self._available = threading.Condition()
+        _OPEN_POOLS.add(self)
+    
+    def _can_acquire(self) -> bool:
+        return bool(self._idle) or len(self._drivers) + self._starting < self.size
+    
+    def acquire(self) -> webdriver.Chrome:
+        """
+        Take an idle driver, starting a new one if the pool is not full yet.
+        Raises TimeoutError if no driver frees up within acquire_timeout seconds.
+        """
+        with self._available:
+            if not self._available.wait_for(self._can_acquire, timeout=self.acquire_timeout):
+                raise TimeoutError(f"no Selenium driver available after {self.acquire_timeout}s")
+            if self._idle:
+                return self._idle.pop()
+            self._starting += 1
+        try:
+            driver = _new_chrome_driver()
+        except Exception:
+            with self._available:
+                self._starting -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._starting -= 1
+            self._drivers.append(driver)
+        return driver
+    
+    def release(self, driver: webdriver.Chrome) -> None:
+        """Return a healthy driver to the pool."""
+        with self._available:
+            if driver in self._drivers:
+                self._idle.append(driver)
+                self._available.notify()
+                return
+        # The pool was closed while the driver was in use
+        with contextlib.suppress(Exception):
+            driver.quit()
+    
+    def discard(self, driver: webdriver.Chrome) -> None:
+        """Quit a broken driver and let a waiting caller start a fresh one."""
+        with self._available:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._available.notify()
+        with contextlib.suppress(Exception):
+            driver.quit()
+    
+    def close(self) -> None:
+        """Quit every driver the pool has started."""
+        _OPEN_POOLS.discard(self)
+        with self._available:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+            self._idle.clear()
+            self._available.notify_all()
+        for driver in drivers:
+            with contextlib.suppress(Exception):
+                driver.quit()
+
 class ContentExtractor:
     """Base class for content extraction strategies."""
     
@@ -49,23 +266,68 @@ class ContentExtractor:
 class BlogExtractor(ContentExtractor):
     """Extracts content from blog posts using multiple strategies."""
     
-    def __init__(self, use_selenium: bool = False):
+    def __init__(self, use_selenium: bool = False, session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None, page_cache: Optional[ExtractionCache] = None,
+                 selenium_workers: int = SELENIUM_WORKERS):
         self.use_selenium = use_selenium
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.selenium_pool = SeleniumPool(selenium_workers) if use_selenium else None
+        self.session = session or _SESSION
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.page_cache = page_cache
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
         
     def extract(self, url: str) -> Optional[Dict[str, Any]]:
-        """Extract content from a blog post URL."""
+        """Extract content from a blog post URL, reusing the page cache when one is set."""
+        cache_key = None
+        if self.page_cache is not None:
+            cache_key = make_cache_key("page", url, self.use_selenium)
+            cached = self.page_cache.get(cache_key)
+            if cached is not None:
+                return cached["items"][0]
+        
         try:
+            self.rate_limiter.acquire(url)
             if self.use_selenium:
-                return self._extract_with_selenium(url)
+                content = self._extract_with_selenium(url)
             else:
-                return self._extract_with_requests(url)
+                content = self._extract_with_requests(url)
         except Exception as e:
-            logger.error(f"Failed to extract content from {url}: {e}")
+            logger.error("Failed to extract content from %s: %s", url, e)
             return None
+        
+        # Pages are stored as single-item results so the cache can validate them
+        if content and cache_key is not None:
+            self.page_cache.put(cache_key, {"team_id": "", "items": [content]})
+        return content
+    
+    def extract_many(self, urls: Iterable[str], desc: str = "Scraping URLs",
+                     concurrency: int = SCRAPE_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Extract several URLs in parallel, with at most PER_HOST_CONCURRENCY requests
+        in flight per host. urls may be a lazy iterable: each URL is submitted as soon
+        as it is produced. Results keep the input order; failed URLs are dropped.
+        """
+        # Selenium scraping is further bounded by the number of pooled browsers
+        if self.selenium_pool is not None:
+            concurrency = min(concurrency, self.selenium_pool.size)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = [pool.submit(self._extract_politely, url) for url in urls]
+            results = [future.result() for future in tqdm(futures, desc=desc)]
+        return [item for item in results if item]
+    
+    def _extract_politely(self, url: str) -> Optional[Dict[str, Any]]:
+        """Extract a URL while holding one of its host's request slots."""
+        with self._host_slot(url):
+            return self.extract(url)
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+        return slot
     
     def _extract_with_requests(self, url: str) -> Optional[Dict[str, Any]]:
         """Extract content using requests and multiple parsing strategies."""
@@ -73,40 +335,62 @@ class BlogExtractor(ContentExtractor):
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
-            # Try trafilatura first (best for article extraction)
-            extracted = trafilatura.extract(response.text, include_formatting=True, include_links=True)
-            if extracted and len(extracted.strip()) > 200:
-                return self._parse_with_trafilatura(response.text, url)
+            # None of the parsers below can do anything with non-HTML responses
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and 'html' not in content_type.lower():
+                logger.warning("Skipping %s: not an HTML page (%s)", url, content_type)
+                return None
+            
+            # Try trafilatura first (best for article extraction); it returns None
+            # unless it finds a substantial article
+            extracted = self._parse_with_trafilatura(response.text, url, min_length=200)
+            if extracted:
+                return extracted
+            
+            # The remaining strategies share one BeautifulSoup tree for title,
+            # author and manual content lookups
+            soup = BeautifulSoup(response.text, HTML_PARSER)
+            
+            # A client-rendered shell has no text for the fallbacks to find
+            if self._looks_like_js_shell(soup):
+                logger.warning("Skipping %s: page is rendered by JavaScript, try --use-selenium", url)
+                return None
             
             # Fallback to readability
-            extracted = self._parse_with_readability(response.text, url)
+            extracted = self._parse_with_readability(response.text, url, soup)
             if extracted:
                 return extracted
             
             # Fallback to newspaper3k
-            extracted = self._parse_with_newspaper(url)
+            extracted = self._parse_with_newspaper(response.text, url)
             if extracted:
                 return extracted
             
             # Last resort: manual parsing
-            return self._parse_manually(response.text, url)
+            return self._parse_manually(response.text, url, soup)
             
         except Exception as e:
-            logger.error(f"Request extraction failed for {url}: {e}")
+            logger.error("Request extraction failed for %s: %s", url, e)
             return None
     
+    @staticmethod
+    def _looks_like_js_shell(soup: BeautifulSoup) -> bool:
+        """Check for a near-empty body that only hosts a JavaScript app."""
+        body = soup.body
+        if body is None or len(body.get_text(strip=True)) >= 200:
+            return False
+        return soup.select_one(_JS_APP_ROOT_SELECTOR) is not None
+    
     def _extract_with_selenium(self, url: str) -> Optional[Dict[str, Any]]:
-        """Extract content using Selenium for JavaScript-heavy sites."""
-        driver = None
+        """Extract content using a pooled Selenium driver for JavaScript-heavy sites."""
+        try:
+            driver = self.selenium_pool.acquire()
+        except Exception as e:
+            logger.error("Could not get a Chrome driver for %s: %s", url, e)
+            return None
+        
+        healthy = True
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            
-            driver = webdriver.Chrome(ChromeDriverManager().install(), options=chrome_options)
             driver.get(url)
             
             # Wait for content to load
@@ -114,34 +398,53 @@ class BlogExtractor(ContentExtractor):
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            # Additional wait for dynamic content
-            time.sleep(3)
+            # Wait for dynamic content to render, returning as soon as it appears
+            with contextlib.suppress(TimeoutException):
+                WebDriverWait(driver, SELENIUM_CONTENT_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, _CONTENT_SELECTOR))
+                )
             
             page_source = driver.page_source
             return self._parse_with_trafilatura(page_source, url)
             
+        except TimeoutException as e:
+            logger.error("Selenium timed out loading %s: %s", url, e)
+            return None
         except Exception as e:
-            logger.error(f"Selenium extraction failed for {url}: {e}")
+            # A crashed or disconnected browser is replaced instead of reused
+            healthy = not isinstance(e, WebDriverException)
+            logger.error("Selenium extraction failed for %s: %s", url, e)
             return None
         finally:
-            if driver:
-                driver.quit()
+            if healthy:
+                self.selenium_pool.release(driver)
+            else:
+                self.selenium_pool.discard(driver)
     
-    def _parse_with_trafilatura(self, html: str, url: str) -> Optional[Dict[str, Any]]:
-        """Parse content using trafilatura."""
+    def close(self) -> None:
+        """Shut down any pooled Selenium browsers."""
+        if self.selenium_pool is not None:
+            self.selenium_pool.close()
+    
+    def _parse_with_trafilatura(self, html: str, url: str, min_length: int = 100) -> Optional[Dict[str, Any]]:
+        """Parse content using trafilatura, if it yields at least min_length characters."""
         try:
+            # Parse the page once and reuse the tree for metadata and content
+            tree = load_html(html)
+            if tree is None:
+                return None
+            
             # Extract metadata
-            metadata = trafilatura.extract_metadata(html, url)
+            metadata = trafilatura.extract_metadata(tree, url)
             
-            # Extract main content
-            content = trafilatura.extract(html, include_formatting=True, include_links=True)
+            # Extract main content straight to markdown
+            markdown_content = trafilatura.extract(
+                tree, output_format='markdown', include_formatting=True, include_links=True
+            )
             
-            if not content or len(content.strip()) < 100:
+            if not markdown_content or len(markdown_content.strip()) < min_length:
                 return None
             
-            # Convert to markdown
-            markdown_content = trafilatura.extract(html, output_format='markdown')
-            
             return {
                 "title": metadata.title if metadata and metadata.title else self._extract_title_from_html(html),
                 "content": markdown_content,
@@ -151,11 +454,11 @@ class BlogExtractor(ContentExtractor):
                 "user_id": ""
             }
         except Exception as e:
-            logger.error(f"Trafilatura parsing failed: {e}")
+            logger.error("Trafilatura parsing failed: %s", e)
             return None
     
-    def _parse_with_readability(self, html: str, url: str) -> Optional[Dict[str, Any]]:
-        """Parse content using readability-lxml."""
+    def _parse_with_readability(self, html: str, url: str, soup: Optional[BeautifulSoup] = None) -> Optional[Dict[str, Any]]:
+        """Parse content using readability-lxml. soup, if given, is the already-parsed html."""
         try:
             doc = Document(html)
             title = doc.title()
@@ -172,25 +475,26 @@ class BlogExtractor(ContentExtractor):
                 "content": markdown_content,
                 "content_type": "blog",
                 "source_url": url,
-                "author": self._extract_author_from_html(html),
+                "author": self._extract_author_from_html(soup or html),
                 "user_id": ""
             }
         except Exception as e:
-            logger.error(f"Readability parsing failed: {e}")
+            logger.error("Readability parsing failed: %s", e)
             return None
     
-    def _parse_with_newspaper(self, url: str) -> Optional[Dict[str, Any]]:
-        """Parse content using newspaper3k."""
+    def _parse_with_newspaper(self, html: str, url: str) -> Optional[Dict[str, Any]]:
+        """Parse already-fetched HTML using newspaper3k."""
         try:
+            # Reuse the page we already fetched instead of letting newspaper download it again
             article = Article(url)
-            article.download()
+            article.set_html(html)
             article.parse()
             
             if not article.text or len(article.text.strip()) < 100:
                 return None
             
             # Convert to markdown (simple conversion)
-            markdown_content = self._text_to_markdown(article.text)
+            markdown_content = _text_to_markdown(article.text)
             
             return {
                 "title": article.title,
@@ -201,28 +505,22 @@ class BlogExtractor(ContentExtractor):
                 "user_id": ""
             }
         except Exception as e:
-            logger.error(f"Newspaper parsing failed: {e}")
+            logger.error("Newspaper parsing failed: %s", e)
             return None
     
-    def _parse_manually(self, html: str, url: str) -> Optional[Dict[str, Any]]:
-        """Manual parsing as last resort."""
+    def _parse_manually(self, html: str, url: str, soup: Optional[BeautifulSoup] = None) -> Optional[Dict[str, Any]]:
+        """Manual parsing as last resort. soup, if given, is the already-parsed html and is modified."""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self._soup(soup or html)
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
                 script.decompose()
             
             # Try to find main content areas
-            content_selectors = [
-                'article', 'main', '.content', '.post-content', '.entry-content',
-                '.article-content', '.blog-content', '.post-body'
-            ]
-            
             content = None
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem and len(content_elem.get_text().strip()) > 200:
+            for content_elem in soup.select(_CONTENT_SELECTOR):
+                if len(content_elem.get_text().strip()) > 200:
                     content = content_elem
                     break
             
@@ -235,24 +533,29 @@ class BlogExtractor(ContentExtractor):
             
             # Extract text and convert to markdown
             text = content.get_text(separator='\n', strip=True)
-            markdown_content = self._text_to_markdown(text)
+            markdown_content = _text_to_markdown(text)
             
             return {
-                "title": self._extract_title_from_html(html),
+                "title": self._extract_title_from_html(soup),
                 "content": markdown_content,
                 "content_type": "blog",
                 "source_url": url,
-                "author": self._extract_author_from_html(html),
+                "author": self._extract_author_from_html(soup),
                 "user_id": ""
             }
         except Exception as e:
-            logger.error(f"Manual parsing failed: {e}")
+            logger.error("Manual parsing failed: %s", e)
             return None
     
-    def _extract_title_from_html(self, html: str) -> str:
-        """Extract title from HTML."""
+    @staticmethod
+    def _soup(html: Union[str, BeautifulSoup]) -> BeautifulSoup:
+        """Return html as a BeautifulSoup tree, parsing it only if needed."""
+        return html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, HTML_PARSER)
+    
+    def _extract_title_from_html(self, html: Union[str, BeautifulSoup]) -> str:
+        """Extract title from HTML or an already-parsed tree."""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self._soup(html)
             title = soup.find('title')
             if title:
                 return title.get_text().strip()
@@ -266,55 +569,23 @@ class BlogExtractor(ContentExtractor):
         except:
             return "Untitled"
     
-    def _extract_author_from_html(self, html: str) -> str:
-        """Extract author from HTML."""
+    def _extract_author_from_html(self, html: Union[str, BeautifulSoup]) -> str:
+        """Extract author from HTML or an already-parsed tree."""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self._soup(html)
             
             # Common author selectors
-            author_selectors = [
-                '.author', '.byline', '.post-author', '.entry-author',
-                '[rel="author"]', '.author-name', '.writer'
-            ]
-            
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    return author_elem.get_text().strip()
-            
-            return ""
+            author_elem = soup.select_one(_AUTHOR_SELECTOR)
+            return author_elem.get_text().strip() if author_elem else ""
         except:
             return ""
-    
-    def _text_to_markdown(self, text: str) -> str:
-        """Convert plain text to basic markdown."""
-        lines = text.split('\n')
-        markdown_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Simple heuristics for headers
-            if len(line) < 100 and line.isupper():
-                markdown_lines.append(f"## {line}")
-            elif len(line) < 80 and line.endswith(':'):
-                markdown_lines.append(f"### {line}")
-            else:
-                markdown_lines.append(line)
-        
-        return '\n\n'.join(markdown_lines)
 
 class RSSFeedExtractor(ContentExtractor):
     """Extracts content from RSS feeds."""
     
     def __init__(self, blog_extractor: BlogExtractor):
         self.blog_extractor = blog_extractor
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = blog_extractor.session
         
     def extract(self, url: str) -> List[Dict[str, Any]]:
         """Extract content from RSS feed URL."""
@@ -324,23 +595,19 @@ class RSSFeedExtractor(ContentExtractor):
             else:
                 return self._extract_with_manual_rss(url)
         except Exception as e:
-            logger.error(f"RSS extraction failed for {url}: {e}")
+            logger.error("RSS extraction failed for %s: %s", url, e)
             return []
     
     def _extract_with_feedparser(self, url: str) -> List[Dict[str, Any]]:
         """Extract using feedparser library."""
-        feed = feedparser.parse(url)
-        items = []
-        
-        for entry in feed.entries:
-            if hasattr(entry, 'link'):
-                logger.info(f"Extracting from RSS entry: {entry.link}")
-                content = self.blog_extractor.extract(entry.link)
-                if content:
-                    items.append(content)
-                time.sleep(1)  # Be respectful
+        # Fetch the feed through the shared session; feedparser only parses the body
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
         
-        return items
+        links = [entry.link for entry in feed.entries if hasattr(entry, 'link')]
+        logger.info("Extracting %d RSS entries from %s", len(links), url)
+        return self.blog_extractor.extract_many(links, desc="Scraping RSS entries")
     
     def _extract_with_manual_rss(self, url: str) -> List[Dict[str, Any]]:
         """Manual RSS parsing as fallback when feedparser is not available."""
@@ -349,7 +616,7 @@ class RSSFeedExtractor(ContentExtractor):
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'xml')
-            items = []
+            links = []
             
             # Look for RSS/Atom entries
             entries = soup.find_all(['item', 'entry'])
@@ -359,42 +626,116 @@ class RSSFeedExtractor(ContentExtractor):
                 if link_elem:
                     link = link_elem.get_text().strip()
                     if link.startswith('http'):
-                        logger.info(f"Extracting from RSS entry: {link}")
-                        content = self.blog_extractor.extract(link)
-                        if content:
-                            items.append(content)
-                        time.sleep(1)  # Be respectful
+                        links.append(link)
             
-            return items
+            logger.info("Extracting %d RSS entries from %s", len(links), url)
+            return self.blog_extractor.extract_many(links, desc="Scraping RSS entries")
         except Exception as e:
-            logger.error(f"Manual RSS parsing failed: {e}")
+            logger.error("Manual RSS parsing failed: %s", e)
             return []
 
+# --- PDF worker processes ---
+_pdf_worker_reader = None
+# True in processes that are already pool workers; they extract pages serially
+# instead of starting a nested process pool
+_in_pdf_worker = False
+
+def init_pdf_pool_worker() -> None:
+    """Initializer for process pools that run PDFExtractor, see _extract_with_pypdf."""
+    global _in_pdf_worker
+    _in_pdf_worker = True
+
+def _init_pdf_worker(source: Union[str, bytes]) -> None:
+    """Open the PDF once per worker process."""
+    global _pdf_worker_reader
+    _pdf_worker_reader = pypdf.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def _pdf_chunk_text(pages: Sequence[Any], page_range: Tuple[int, int]) -> str:
+    """Concatenate the text of pages[start:end]."""
+    return ''.join(pages[page_num].extract_text() + "\n\n" for page_num in range(*page_range))
+
+def _extract_pdf_chunk(page_range: Tuple[int, int]) -> str:
+    """Extract one chunk of the worker's PDF."""
+    return _pdf_chunk_text(_pdf_worker_reader.pages, page_range)
+
 class PDFExtractor(ContentExtractor):
     """Extracts content from PDF files."""
     
-    def extract(self, file_path: str) -> List[Dict[str, Any]]:
-        """Extract content from PDF file."""
+    def extract(self, file_path: Union[str, BinaryIO], source_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Extract content from a PDF file path or an open binary stream (e.g. io.BytesIO).
+        source_url is recorded on each item; it defaults to the file:// URL of the path.
+        """
+        if source_url is None:
+            source_url = f"file://{file_path}"
         try:
             items = []
             
-            # Try with pypdf first (newer library)
+            # Prefer PyMuPDF's native text extractor when it is installed
+            if PYMUPDF_AVAILABLE:
+                try:
+                    return self._extract_with_pymupdf(file_path, source_url)
+                except Exception as e:
+                    logger.warning("PyMuPDF failed, trying pypdf: %s", e)
+            
+            # Then pypdf (newer library)
             try:
-                items = self._extract_with_pypdf(file_path)
+                items = self._extract_with_pypdf(file_path, source_url)
             except Exception as e:
-                logger.warning(f"pypdf failed, trying PyPDF2: {e}")
-                items = self._extract_with_pypdf2(file_path)
+                logger.warning("pypdf failed, trying PyPDF2: %s", e)
+                items = self._extract_with_pypdf2(file_path, source_url)
             
             return items
         except Exception as e:
-            logger.error(f"PDF extraction failed for {file_path}: {e}")
+            logger.error("PDF extraction failed for %s: %s", source_url, e)
             return []
     
-    def _extract_with_pypdf(self, file_path: str) -> List[Dict[str, Any]]:
-        """Extract using pypdf library."""
+    @staticmethod
+    def _open(source: Union[str, BinaryIO]):
+        """Open a path for reading, or rewind an already open stream."""
+        if hasattr(source, 'read'):
+            source.seek(0)
+            return contextlib.nullcontext(source)
+        return open(source, 'rb')
+    
+    def _extract_with_pymupdf(self, file_path: Union[str, BinaryIO], source_url: str) -> List[Dict[str, Any]]:
+        """Extract using PyMuPDF, which decodes pages in native code."""
+        items = []
+        
+        if isinstance(file_path, str):
+            doc = fitz.open(file_path)
+        else:
+            file_path.seek(0)
+            doc = fitz.open(stream=file_path.read(), filetype="pdf")
+        
+        with doc:
+            metadata = doc.metadata or {}
+            title = metadata.get('title') or 'Untitled'
+            author = metadata.get('author') or ''
+            
+            # Process pages in chunks
+            total_pages = doc.page_count
+            for chunk_start in range(0, total_pages, PDF_CHUNK_PAGES):
+                chunk_end = min(chunk_start + PDF_CHUNK_PAGES, total_pages)
+                chunk_text = '\n\n'.join(doc[page_num].get_text('text') for page_num in range(chunk_start, chunk_end))
+                
+                if chunk_text.strip():
+                    items.append({
+                        "title": f"{title} - Pages {chunk_start + 1}-{chunk_end}",
+                        "content": _text_to_markdown(chunk_text),
+                        "content_type": "book",
+                        "source_url": source_url,
+                        "author": author,
+                        "user_id": ""
+                    })
+        
+        return items
+    
+    def _extract_with_pypdf(self, file_path: Union[str, BinaryIO], source_url: str) -> List[Dict[str, Any]]:
+        """Extract using pypdf library; large PDFs are split across worker processes."""
         items = []
         
-        with open(file_path, 'rb') as file:
+        with self._open(file_path) as file:
             pdf_reader = pypdf.PdfReader(file)
             
             # Extract metadata
@@ -403,37 +744,46 @@ class PDFExtractor(ContentExtractor):
             author = metadata.get('/Author', '') if metadata else ''
             
             # Process pages in chunks
-            chunk_size = 5  # pages per chunk
             total_pages = len(pdf_reader.pages)
+            page_ranges = [
+                (chunk_start, min(chunk_start + PDF_CHUNK_PAGES, total_pages))
+                for chunk_start in range(0, total_pages, PDF_CHUNK_PAGES)
+            ]
             
-            for chunk_start in range(0, total_pages, chunk_size):
-                chunk_end = min(chunk_start + chunk_size, total_pages)
-                chunk_text = ""
-                
-                for page_num in range(chunk_start, chunk_end):
-                    page = pdf_reader.pages[page_num]
-                    chunk_text += page.extract_text() + "\n\n"
-                
+            if total_pages >= PDF_PARALLEL_MIN_PAGES and not _in_pdf_worker:
+                # Text extraction is CPU-bound; each worker opens the PDF once and
+                # handles whole chunks
+                if isinstance(file_path, str):
+                    source = file_path
+                else:
+                    file.seek(0)
+                    source = file.read()
+                with ProcessPoolExecutor(initializer=_init_pdf_worker, initargs=(source,)) as pool:
+                    chunk_texts = list(pool.map(_extract_pdf_chunk, page_ranges))
+            else:
+                chunk_texts = [_pdf_chunk_text(pdf_reader.pages, page_range) for page_range in page_ranges]
+            
+            for (chunk_start, chunk_end), chunk_text in zip(page_ranges, chunk_texts):
                 if chunk_text.strip():
                     # Convert to markdown
-                    markdown_content = self._text_to_markdown(chunk_text)
+                    markdown_content = _text_to_markdown(chunk_text)
                     
                     items.append({
                         "title": f"{title} - Pages {chunk_start + 1}-{chunk_end}",
                         "content": markdown_content,
                         "content_type": "book",
-                        "source_url": f"file://{file_path}",
+                        "source_url": source_url,
                         "author": author,
                         "user_id": ""
                     })
         
         return items
     
-    def _extract_with_pypdf2(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_with_pypdf2(self, file_path: Union[str, BinaryIO], source_url: str) -> List[Dict[str, Any]]:
         """Extract using PyPDF2 library (fallback)."""
         items = []
         
-        with open(file_path, 'rb') as file:
+        with self._open(file_path) as file:
             pdf_reader = PyPDF2.PdfReader(file)
             
             # Extract metadata
@@ -442,217 +792,196 @@ class PDFExtractor(ContentExtractor):
             author = metadata.get('/Author', '') if metadata else ''
             
             # Process pages in chunks
-            chunk_size = 5
             total_pages = len(pdf_reader.pages)
             
-            for chunk_start in range(0, total_pages, chunk_size):
-                chunk_end = min(chunk_start + chunk_size, total_pages)
-                chunk_text = ""
-                
-                for page_num in range(chunk_start, chunk_end):
-                    page = pdf_reader.pages[page_num]
-                    chunk_text += page.extract_text() + "\n\n"
+            for chunk_start in range(0, total_pages, PDF_CHUNK_PAGES):
+                chunk_end = min(chunk_start + PDF_CHUNK_PAGES, total_pages)
+                chunk_text = _pdf_chunk_text(pdf_reader.pages, (chunk_start, chunk_end))
                 
                 if chunk_text.strip():
-                    markdown_content = self._text_to_markdown(chunk_text)
+                    markdown_content = _text_to_markdown(chunk_text)
                     
                     items.append({
                         "title": f"{title} - Pages {chunk_start + 1}-{chunk_end}",
                         "content": markdown_content,
                         "content_type": "book",
-                        "source_url": f"file://{file_path}",
+                        "source_url": source_url,
                         "author": author,
                         "user_id": ""
                     })
         
         return items
-    
-    def _text_to_markdown(self, text: str) -> str:
-        """Convert PDF text to markdown."""
-        lines = text.split('\n')
-        markdown_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Simple heuristics for headers
-            if len(line) < 100 and line.isupper():
-                markdown_lines.append(f"## {line}")
-            elif len(line) < 80 and line.endswith(':'):
-                markdown_lines.append(f"### {line}")
-            else:
-                markdown_lines.append(line)
-        
-        return '\n\n'.join(markdown_lines)
 
 class URLDiscoverer:
     """Discovers URLs from various sources."""
     
     def __init__(self, blog_extractor: BlogExtractor):
         self.blog_extractor = blog_extractor
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = blog_extractor.session
     
     def discover_blog_urls(self, base_url: str, max_pages: int = 10) -> List[str]:
         """Discover blog post URLs from a blog homepage."""
-        urls = set()
+        return list(self.iter_blog_urls(base_url, max_pages))
+    
+    def iter_blog_urls(self, base_url: str, max_pages: int = 10) -> Iterator[str]:
+        """
+        Yield unique blog post URLs from a blog homepage, one listing page at a time,
+        so callers can start on early posts before later pages are fetched.
+        """
+        seen = set()
+        
+        def new_urls(urls: Iterable[str]) -> Iterator[str]:
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    yield url
         
         try:
-            # Try to find pagination
-            page_urls = self._discover_pagination(base_url, max_pages)
+            # The homepage is fetched once for both its post links and its pagination
+            soup = self._fetch_listing_page(base_url)
+            if soup is None:
+                return
+            page_urls = self._discover_pagination(base_url, max_pages, soup)
+            yield from new_urls(self._blog_urls_on_page(soup, base_url))
             
-            for page_url in page_urls:
-                page_urls = self._extract_blog_urls_from_page(page_url)
-                urls.update(page_urls)
-                time.sleep(1)  # Be respectful
+            if len(page_urls) > 1:
+                for page_url in page_urls[1:]:
+                    yield from new_urls(self._extract_blog_urls_from_page(page_url))
+                return
             
-            return list(urls)
+            # No pagination links: follow the common /page/N/ URL template until a
+            # page is missing or adds no new posts
+            for page_num in range(2, max_pages + 1):
+                page_url = f"{base_url.rstrip('/')}/page/{page_num}/"
+                soup = self._fetch_listing_page(page_url)
+                if soup is None:
+                    break
+                found = len(seen)
+                yield from new_urls(self._blog_urls_on_page(soup, page_url))
+                if len(seen) == found:
+                    break
         except Exception as e:
-            logger.error(f"URL discovery failed for {base_url}: {e}")
-            return []
+            logger.error("URL discovery failed for %s: %s", base_url, e)
+    
+    def _fetch_listing_page(self, page_url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a listing page; returns None if it does not exist."""
+        self.blog_extractor.rate_limiter.acquire(page_url)
+        response = self.session.get(page_url, timeout=30)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return BeautifulSoup(response.text, HTML_PARSER)
     
-    def _discover_pagination(self, base_url: str, max_pages: int) -> List[str]:
-        """Discover pagination URLs."""
+    def _discover_pagination(self, base_url: str, max_pages: int, soup: BeautifulSoup) -> List[str]:
+        """Discover pagination URLs linked from the parsed homepage."""
         page_urls = [base_url]
+        seen = {base_url}
         
-        try:
-            response = self.session.get(base_url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Look for pagination links
-            pagination_selectors = [
-                '.pagination a', '.pager a', '.page-numbers a',
-                'a[rel="next"]', '.next a', '.prev a'
-            ]
-            
-            for selector in pagination_selectors:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(base_url, href)
-                        if full_url not in page_urls and len(page_urls) < max_pages:
-                            page_urls.append(full_url)
-            
-            return page_urls[:max_pages]
-        except Exception as e:
-            logger.error(f"Pagination discovery failed: {e}")
-            return [base_url]
+        # Look for pagination links
+        for link in soup.select(_PAGINATION_SELECTOR):
+            href = link.get('href')
+            if href:
+                full_url = urljoin(base_url, href)
+                if full_url not in seen and len(page_urls) < max_pages:
+                    seen.add(full_url)
+                    page_urls.append(full_url)
+        
+        return page_urls
     
     def _extract_blog_urls_from_page(self, page_url: str) -> List[str]:
         """Extract blog post URLs from a single page."""
-        urls = []
-        
         try:
-            response = self.session.get(page_url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Common selectors for blog post links
-            link_selectors = [
-                'article a', '.post a', '.blog-post a', '.entry a',
-                '.post-title a', '.entry-title a', 'h2 a', 'h3 a'
-            ]
-            
-            for selector in link_selectors:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(page_url, href)
-                        # Filter out non-blog URLs
-                        if self._is_blog_post_url(full_url):
-                            urls.append(full_url)
-            
-            return list(set(urls))
+            soup = self._fetch_listing_page(page_url)
+            return self._blog_urls_on_page(soup, page_url) if soup is not None else []
         except Exception as e:
-            logger.error(f"URL extraction failed for {page_url}: {e}")
+            logger.error("URL extraction failed for %s: %s", page_url, e)
             return []
     
+    def _blog_urls_on_page(self, soup: BeautifulSoup, page_url: str) -> List[str]:
+        """Collect blog post links from a parsed listing page, in page order."""
+        urls: Dict[str, None] = {}  # ordered set
+        
+        # Common selectors for blog post links
+        for link in soup.select(_POST_LINK_SELECTOR):
+            href = link.get('href')
+            if href:
+                full_url = urljoin(page_url, href)
+                # Filter out non-blog URLs
+                if self._is_blog_post_url(full_url):
+                    urls[full_url] = None
+        
+        return list(urls)
+    
     def _is_blog_post_url(self, url: str) -> bool:
         """Check if URL looks like a blog post."""
         # Skip common non-blog URLs
-        skip_patterns = [
-            r'/tag/', r'/category/', r'/author/', r'/page/', r'/search',
-            r'/about', r'/contact', r'/privacy', r'/terms', r'/feed',
-            r'\.(pdf|doc|docx|jpg|jpeg|png|gif)$'
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, url, re.IGNORECASE):
-                return False
-        
-        return True
+        return not _SKIP_URL_RE.search(url)
 
 class THTScraper:
-    """Main scraper class that orchestrates content extraction."""
+    """
+    Main scraper class that orchestrates content extraction.
+    With use_cache, extracted pages are reused from EXTRACTION_CACHE_DIR for cache_ttl seconds.
+    """
     
-    def __init__(self, team_id: str, use_selenium: bool = False):
+    def __init__(self, team_id: str, use_selenium: bool = False, per_host_rps: float = DEFAULT_PER_HOST_RPS,
+                 use_cache: bool = False, cache_ttl: Optional[float] = PAGE_CACHE_TTL_SECONDS,
+                 selenium_workers: int = SELENIUM_WORKERS):
         self.team_id = team_id
-        self.blog_extractor = BlogExtractor(use_selenium=use_selenium)
+        page_cache = ExtractionCache(os.getenv("EXTRACTION_CACHE_DIR", ".extraction_cache"), ttl=cache_ttl) if use_cache else None
+        self.blog_extractor = BlogExtractor(
+            use_selenium=use_selenium, rate_limiter=HostRateLimiter(per_host_rps), page_cache=page_cache,
+            selenium_workers=selenium_workers
+        )
         self.rss_extractor = RSSFeedExtractor(self.blog_extractor)
         self.pdf_extractor = PDFExtractor()
         self.url_discoverer = URLDiscoverer(self.blog_extractor)
     
     def scrape_blog(self, blog_url: str, max_posts: int = 50) -> List[Dict[str, Any]]:
         """Scrape a blog for all posts."""
-        logger.info(f"Starting blog scrape for: {blog_url}")
+        logger.info("Starting blog scrape for: %s", blog_url)
         
         # Check if it's an RSS feed
         if self._is_rss_feed(blog_url):
             logger.info("Detected RSS feed, using RSS extractor")
             return self.rss_extractor.extract(blog_url)
         
-        # Discover blog post URLs
+        # Discover blog post URLs lazily, so extraction starts with the first listing page
         logger.info("Discovering blog post URLs...")
-        blog_urls = self.url_discoverer.discover_blog_urls(blog_url)
+        blog_urls = self.url_discoverer.iter_blog_urls(blog_url)
+        first_url = next(blog_urls, None)
         
-        if not blog_urls:
+        if first_url is None:
             logger.warning("No blog URLs discovered, trying direct extraction")
             content = self.blog_extractor.extract(blog_url)
             return [content] if content else []
         
-        # Limit the number of posts
-        blog_urls = blog_urls[:max_posts]
-        logger.info(f"Found {len(blog_urls)} blog posts to scrape")
-        
-        # Extract content from each URL
-        items = []
-        for url in tqdm(blog_urls, desc="Scraping blog posts"):
-            content = self.blog_extractor.extract(url)
-            if content:
-                items.append(content)
-            time.sleep(1)  # Be respectful
+        # Limit the number of posts; discovery stops once max_posts URLs are found
+        blog_urls = itertools.islice(itertools.chain([first_url], blog_urls), max_posts)
         
+        # Extract content from the posts in parallel, a few at a time per host
+        items = self.blog_extractor.extract_many(blog_urls, desc="Scraping blog posts")
+        logger.info("Extracted %d blog posts", len(items))
         return items
     
-    def scrape_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Scrape content from a PDF file."""
-        logger.info(f"Starting PDF scrape for: {pdf_path}")
-        return self.pdf_extractor.extract(pdf_path)
+    def scrape_pdf(self, pdf_path: Union[str, BinaryIO], source_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Scrape content from a PDF file path or in-memory stream."""
+        logger.info("Starting PDF scrape for: %s", source_url or pdf_path)
+        return self.pdf_extractor.extract(pdf_path, source_url)
     
-    def scrape_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
-        """Scrape content from a list of URLs."""
-        logger.info(f"Starting URL scrape for {len(urls)} URLs")
-        
-        items = []
-        for url in tqdm(urls, desc="Scraping URLs"):
-            content = self.blog_extractor.extract(url)
-            if content:
-                items.append(content)
-            time.sleep(1)  # Be respectful
-        
-        return items
+    def scrape_urls(self, urls: List[str], concurrency: int = SCRAPE_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Scrape content from a list of URLs, fetching up to concurrency pages at once."""
+        # Drop repeated URLs, keeping the first occurrence's position
+        urls = list(dict.fromkeys(urls))
+        logger.info("Starting URL scrape for %d URLs", len(urls))
+        return self.blog_extractor.extract_many(urls, desc="Scraping URLs", concurrency=concurrency)
+    
+    def close(self) -> None:
+        """Release browsers held by the scraper."""
+        self.blog_extractor.close()
     
     def _is_rss_feed(self, url: str) -> bool:
         """Check if URL is an RSS feed."""
-        rss_patterns = [r'\.xml$', r'/feed', r'/rss', r'/atom']
-        return any(re.search(pattern, url, re.IGNORECASE) for pattern in rss_patterns)
+        return bool(_RSS_URL_RE.search(url))
     
     def export_to_knowledgebase_format(self, items: List[Dict[str, Any]], output_file: str = None) -> Dict[str, Any]:
         """Export items to knowledgebase format."""
@@ -662,9 +991,11 @@ class THTScraper:
         }
         
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(knowledgebase_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Exported {len(items)} items to {output_file}")
+            # orjson writes UTF-8 directly, matching the old ensure_ascii=False output.
+            # Writing to a temporary file first means an interrupted export never
+            # leaves a truncated knowledgebase behind.
+            write_bytes_atomic(output_file, orjson.dumps(knowledgebase_data, option=orjson.OPT_INDENT_2))
+            logger.info("Exported %d items to %s", len(items), output_file)
         
         return knowledgebase_data
 
@@ -678,33 +1009,44 @@ def main():
     @click.option('--output', default='knowledgebase.json', help='Output file path')
     @click.option('--use-selenium', is_flag=True, help='Use Selenium for JavaScript-heavy sites')
     @click.option('--max-posts', default=50, help='Maximum number of blog posts to scrape')
-    def scrape(team_id, blog_url, pdf_path, urls, output, use_selenium, max_posts):
+    @click.option('--per-host-rps', default=DEFAULT_PER_HOST_RPS, type=float,
+                  help='Maximum requests per second to any single host (0 disables the limit)')
+    @click.option('--no-cache', is_flag=True, help='Re-download every page instead of reusing cached extractions')
+    @click.option('--cache-ttl', default=PAGE_CACHE_TTL_SECONDS, type=float,
+                  help='Seconds a cached page extraction stays valid')
+    @click.option('--selenium-workers', default=SELENIUM_WORKERS, help='Number of headless browsers used with --use-selenium')
+    def scrape(team_id, blog_url, pdf_path, urls, output, use_selenium, max_posts, per_host_rps, no_cache, cache_ttl,
+               selenium_workers):
         """THT Scraper - Extract content for knowledgebase import."""
         
-        scraper = THTScraper(team_id, use_selenium=use_selenium)
-        all_items = []
-        
-        if blog_url:
-            logger.info(f"Scraping blog: {blog_url}")
-            items = scraper.scrape_blog(blog_url, max_posts)
-            all_items.extend(items)
-        
-        if pdf_path:
-            logger.info(f"Scraping PDF: {pdf_path}")
-            items = scraper.scrape_pdf(pdf_path)
-            all_items.extend(items)
-        
-        if urls:
-            url_list = [url.strip() for url in urls.split(',')]
-            logger.info(f"Scraping URLs: {url_list}")
-            items = scraper.scrape_urls(url_list)
-            all_items.extend(items)
-        
-        if all_items:
-            scraper.export_to_knowledgebase_format(all_items, output)
-            logger.info(f"Successfully scraped {len(all_items)} items")
-        else:
-            logger.warning("No items were scraped")
+        scraper = THTScraper(team_id, use_selenium=use_selenium, per_host_rps=per_host_rps,
+                             use_cache=not no_cache, cache_ttl=cache_ttl, selenium_workers=selenium_workers)
+        try:
+            all_items = []
+            
+            if blog_url:
+                logger.info("Scraping blog: %s", blog_url)
+                items = scraper.scrape_blog(blog_url, max_posts)
+                all_items.extend(items)
+            
+            if pdf_path:
+                logger.info("Scraping PDF: %s", pdf_path)
+                items = scraper.scrape_pdf(pdf_path)
+                all_items.extend(items)
+            
+            if urls:
+                url_list = [url.strip() for url in urls.split(',')]
+                logger.info("Scraping URLs: %s", url_list)
+                items = scraper.scrape_urls(url_list)
+                all_items.extend(items)
+            
+            if all_items:
+                scraper.export_to_knowledgebase_format(all_items, output)
+                logger.info("Successfully scraped %d items", len(all_items))
+            else:
+                logger.warning("No items were scraped")
+        finally:
+            scraper.close()
     
     scrape()
 
@@ -0,0 +1,26 @@
+import orjson
+import pytest
+
+agent_layer = pytest.importorskip("agent_layer")
+
+
+@pytest.mark.parametrize("message, intents", [
+    ("Scrape this pdf: report.pdf", {"pdf"}),
+    ("Scrape these PDFs: a.pdf b.pdf", {"pdf"}),
+    ("Read the Blogs on example.com", {"blog"}),
+    ("Scrape https://example.com", {"http"}),
+    ("Scrape this url", {"url"}),
+    ("Scrape these URLs", {"url"}),
+    ("Ask the blogger about their pdfviewer", set()),
+])
+def test_detect_intents(message, intents):
+    assert agent_layer._detect_intents(message) == intents
+
+
+def test_openai_tools_view_is_read_only_and_matches_serialised_schemas():
+    tools = agent_layer.OPENAI_TOOLS
+
+    with pytest.raises(TypeError):
+        tools[0]["function"]["name"] = "changed"
+    assert [tool["function"]["name"] for tool in tools] == \
+        [tool["function"]["name"] for tool in orjson.loads(agent_layer.get_openai_tools_bytes())]
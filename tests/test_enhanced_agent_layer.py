@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from extraction_cache import ExtractionCache
+
+enhanced_agent_layer = pytest.importorskip("enhanced_agent_layer")
+pytest.importorskip("intelligent_scraper")
+
+
+class FakeScraper:
+    def __init__(self):
+        self.calls = 0
+
+    def is_natural_language_request(self, request):
+        return False
+
+    async def process_request(self, request, max_items=10):
+        self.calls += 1
+        return {"team_id": "team", "items": [{
+            "title": f"Fetch {self.calls}", "content": "Body", "content_type": "web_page",
+            "source_url": request, "author": "", "user_id": ""
+        }]}
+
+
+@pytest.fixture
+def fake_scraper(tmp_path, monkeypatch):
+    scraper = FakeScraper()
+    monkeypatch.setattr(enhanced_agent_layer, "_get_scraper", lambda *args, **kwargs: scraper)
+    monkeypatch.setattr(enhanced_agent_layer, "_EXTRACTION_CACHE", ExtractionCache(tmp_path, ttl=60))
+    return scraper
+
+
+def test_scrape_intelligent_reuses_cached_url_results(fake_scraper):
+    first = asyncio.run(enhanced_agent_layer.scrape_intelligent("team", "https://example.com"))
+    second = asyncio.run(enhanced_agent_layer.scrape_intelligent("team", "https://example.com"))
+
+    assert fake_scraper.calls == 1
+    assert second == first
+
+
+def test_scrape_intelligent_without_cache_refreshes_the_entry(fake_scraper):
+    asyncio.run(enhanced_agent_layer.scrape_intelligent("team", "https://example.com"))
+    refreshed = asyncio.run(enhanced_agent_layer.scrape_intelligent("team", "https://example.com", use_cache=False))
+    cached = asyncio.run(enhanced_agent_layer.scrape_intelligent("team", "https://example.com"))
+
+    assert fake_scraper.calls == 2
+    assert cached == refreshed
+    assert refreshed["items"][0]["title"] == "Fetch 2"
@@ -0,0 +1,186 @@
+import os
+
+import pytest
+
+import extraction_cache
+from extraction_cache import ExtractionCache, is_valid_knowledgebase_result, make_cache_key, write_bytes_atomic
+
+
+def _result(team_id="team", count=1):
+    return {
+        "team_id": team_id,
+        "items": [
+            {
+                "title": f"Post {i}",
+                "content": "Body",
+                "content_type": "blog",
+                "source_url": f"https://example.com/post-{i}",
+                "author": "",
+                "user_id": ""
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def _leftover_temp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_make_cache_key_is_stable_and_split_sensitive():
+    assert make_cache_key("page", "https://example.com", False) == make_cache_key("page", "https://example.com", False)
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+    assert make_cache_key("page", "https://example.com", False) != make_cache_key("page", "https://example.com", True)
+
+
+def test_put_then_get_round_trips(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test", "https://example.com")
+
+    assert cache.put(key, _result(count=2))
+    assert cache.get(key) == _result(count=2)
+
+
+def test_get_misses_for_unknown_key(tmp_path):
+    cache = ExtractionCache(tmp_path)
+
+    assert cache.get(make_cache_key("missing")) is None
+
+
+def test_expired_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(tmp_path, ttl=60)
+    key = make_cache_key("test")
+    cache.put(key, _result())
+
+    # Age the entry past the TTL
+    path = cache._path(key)
+    old = path.stat().st_mtime - 120
+    os.utime(path, (old, old))
+
+    assert cache.get(key) is None
+    assert not path.exists()
+
+
+def test_entries_within_ttl_are_returned(tmp_path):
+    cache = ExtractionCache(tmp_path, ttl=60)
+    key = make_cache_key("test")
+    cache.put(key, _result())
+
+    assert cache.get(key) == _result()
+
+
+def test_stats_count_hits_and_misses(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test")
+    cache.put(key, _result())
+
+    cache.get(key)
+    cache.get(make_cache_key("missing"))
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+@pytest.mark.parametrize("result", [
+    {"team_id": "team", "items": [], "error": "boom"},
+    {"team_id": "team", "items": []},
+    {"team_id": "team", "items": [{"title": "Missing fields"}]},
+    {"items": _result()["items"]},
+    ["not", "a", "dict"],
+])
+def test_put_rejects_errors_and_malformed_results(tmp_path, result):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test")
+
+    assert not cache.put(key, result)
+    assert cache.get(key) is None
+
+
+def test_is_valid_knowledgebase_result():
+    assert is_valid_knowledgebase_result(_result())
+    assert is_valid_knowledgebase_result({"team_id": "team", "items": []})
+    assert not is_valid_knowledgebase_result({"team_id": "team", "items": [], "error": "boom"})
+    assert not is_valid_knowledgebase_result({"team_id": 1, "items": []})
+    assert not is_valid_knowledgebase_result({"team_id": "team", "items": ["not an item"]})
+
+
+def test_corrupt_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test")
+    cache.put(key, _result())
+    cache._path(key).write_bytes(b"{not json")
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+
+def test_invalid_entries_on_disk_are_evicted(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test")
+    cache._path(key).write_bytes(b'{"team_id": "team", "items": [{"title": "x"}]}')
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+
+def test_put_leaves_no_temporary_files(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    for i in range(3):
+        assert cache.put(make_cache_key("test", i), _result(count=i + 1))
+
+    assert _leftover_temp_files(tmp_path) == []
+    assert len(list(tmp_path.glob("*.json"))) == 3
+
+
+def test_failed_put_keeps_previous_entry(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path)
+    key = make_cache_key("test")
+    cache.put(key, _result(count=1))
+
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(extraction_cache.os, "replace", fail_replace)
+    assert not cache.put(key, _result(count=2))
+    monkeypatch.undo()
+
+    assert cache.get(key) == _result(count=1)
+    assert _leftover_temp_files(tmp_path) == []
+
+
+def test_write_bytes_atomic_replaces_file(tmp_path):
+    target = tmp_path / "knowledgebase.json"
+    target.write_bytes(b"old")
+
+    write_bytes_atomic(target, b"new")
+
+    assert target.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["knowledgebase.json"]
+
+
+def test_write_bytes_atomic_removes_temp_file_on_failure(tmp_path):
+    target = tmp_path / "knowledgebase.json"
+    target.write_bytes(b"old")
+
+    with pytest.raises(TypeError):
+        write_bytes_atomic(target, "not bytes")
+
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["knowledgebase.json"]
+
+
+def test_write_bytes_atomic_uses_umask_default_mode(tmp_path):
+    target = tmp_path / "knowledgebase.json"
+
+    write_bytes_atomic(target, b"new")
+
+    assert target.stat().st_mode & 0o777 == 0o666 & ~extraction_cache._UMASK
+
+
+def test_write_bytes_atomic_keeps_existing_mode(tmp_path):
+    target = tmp_path / "knowledgebase.json"
+    target.write_bytes(b"old")
+    target.chmod(0o640)
+
+    write_bytes_atomic(target, b"new")
+
+    assert target.stat().st_mode & 0o777 == 0o640
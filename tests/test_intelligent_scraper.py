@@ -0,0 +1,193 @@
+import asyncio
+import re
+
+import orjson
+import pytest
+
+intelligent_scraper = pytest.importorskip("intelligent_scraper")
+
+# --- _find_json_object ---
+# The greedy pattern _find_json_object replaced
+_OLD_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def _old_find_json_object(content):
+    match = _OLD_JSON_RE.search(content)
+    if not match:
+        return None
+    try:
+        return orjson.loads(match.group())
+    except orjson.JSONDecodeError:
+        return None
+
+
+@pytest.mark.parametrize("content", [
+    '{"title": "Post", "content": "Body"}',
+    'Here is the result: {"items": [{"title": "A"}, {"title": "B"}]} Done.',
+    '```json\n{"title": "Post",\n "content": "Line {1}\\nLine 2"}\n```',
+    '{"nested": {"deep": {"value": 1}}, "escaped": "quote \\" and brace }"}',
+    'no json here',
+    '{"unterminated": ',
+])
+def test_find_json_object_matches_old_regex(content):
+    assert intelligent_scraper._find_json_object(content) == _old_find_json_object(content)
+
+
+def test_find_json_object_ignores_trailing_braces_in_prose():
+    content = 'Result: {"title": "Post"} and a stray } in the summary'
+
+    assert _old_find_json_object(content) is None
+    assert intelligent_scraper._find_json_object(content) == {"title": "Post"}
+
+
+def test_find_json_object_skips_leading_non_json_braces():
+    content = 'Template {placeholder} then {"title": "Post"}'
+
+    assert intelligent_scraper._find_json_object(content) == {"title": "Post"}
+
+
+def test_find_json_object_ignores_braces_inside_strings():
+    content = 'prefix {"content": "a } b { c"} suffix }'
+
+    assert intelligent_scraper._find_json_object(content) == {"content": "a } b { c"}
+
+
+# --- _trie_pattern ---
+@pytest.mark.parametrize("words, flags", [
+    (intelligent_scraper._NL_INDICATORS, re.IGNORECASE),
+    (intelligent_scraper._BLOG_POST_INDICATORS, re.IGNORECASE),
+    (intelligent_scraper._SINGLE_PAGE_INDICATORS, 0),
+    (intelligent_scraper._COLLECTION_INDICATORS, 0),
+    (("a", "ab", "abc", "b"), 0),
+])
+def test_trie_pattern_matches_like_plain_alternation(words, flags):
+    trie_re = re.compile(intelligent_scraper._trie_pattern(words), flags)
+    old_re = re.compile('|'.join(map(re.escape, words)), flags)
+    samples = [
+        "Go to Quora and scrape the second post",
+        "VISIT example.com and FIND the first article",
+        "https://example.com/blog/2024/post-12.html",
+        "https://example.com/category/python",
+        "https://example.com/blog$",
+        "https://example.com/how-to-write-tests",
+        "https://example.com/docs",
+        "plain text with nothing to match",
+        "abc", "ab", "a", "b", "",
+    ]
+    samples.extend(words)
+
+    for sample in samples:
+        assert bool(trie_re.search(sample)) == bool(old_re.search(sample)), sample
+
+
+def test_trie_pattern_factors_shared_prefixes():
+    assert intelligent_scraper._trie_pattern(("find", "first")) == "fi(?:nd|rst)"
+    assert re.fullmatch(intelligent_scraper._trie_pattern(("go", "go to")), "go to")
+
+
+# --- handle_direct_urls ---
+@pytest.fixture
+def scraper():
+    instance = intelligent_scraper.IntelligentScraper("team")
+    yield instance
+    asyncio.run(instance.aclose())
+
+
+def _item(url):
+    return {
+        "title": url, "content": "Body", "content_type": "web_page",
+        "source_url": url, "author": "", "user_id": ""
+    }
+
+
+def test_handle_direct_urls_fetches_each_url_once_in_order(scraper, monkeypatch):
+    calls = []
+
+    async def fake_handle_direct_url(url, max_items=10):
+        calls.append(url)
+        return {"team_id": "team", "items": [_item(url)]}
+
+    monkeypatch.setattr(scraper, "handle_direct_url", fake_handle_direct_url)
+    urls = ["https://a.com", "https://b.com", "https://a.com", "https://c.com", "https://b.com"]
+
+    result = asyncio.run(scraper.handle_direct_urls(urls))
+
+    assert sorted(calls) == ["https://a.com", "https://b.com", "https://c.com"]
+    assert result == {
+        "team_id": "team",
+        "items": [_item("https://a.com"), _item("https://b.com"), _item("https://c.com")]
+    }
+
+
+def test_handle_direct_urls_keeps_items_despite_partial_errors(scraper, monkeypatch):
+    async def fake_handle_direct_url(url, max_items=10):
+        if url == "https://broken.com":
+            return {"error": "timeout", "items": []}
+        return {"team_id": "team", "items": [_item(url)]}
+
+    monkeypatch.setattr(scraper, "handle_direct_url", fake_handle_direct_url)
+
+    result = asyncio.run(scraper.handle_direct_urls(["https://broken.com", "https://a.com"]))
+
+    assert result == {"team_id": "team", "items": [_item("https://a.com")]}
+
+
+def test_handle_direct_urls_reports_errors_when_nothing_succeeds(scraper, monkeypatch):
+    async def fake_handle_direct_url(url, max_items=10):
+        return {"error": "timeout", "items": []}
+
+    monkeypatch.setattr(scraper, "handle_direct_url", fake_handle_direct_url)
+
+    result = asyncio.run(scraper.handle_direct_urls(["https://a.com", "https://b.com", "https://a.com"]))
+
+    assert result["items"] == []
+    assert result["error"] == "https://a.com: timeout; https://b.com: timeout"
+
+
+def test_handle_direct_urls_respects_concurrency(scraper, monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_handle_direct_url(url, max_items=10):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"team_id": "team", "items": [_item(url)]}
+
+    monkeypatch.setattr(scraper, "handle_direct_url", fake_handle_direct_url)
+    urls = [f"https://example.com/{i}" for i in range(10)]
+
+    result = asyncio.run(scraper.handle_direct_urls(urls, concurrency=3))
+
+    assert peak == 3
+    assert [item["source_url"] for item in result["items"]] == urls
+
+
+# --- _result_writer ---
+def test_result_writer_survives_unserialisable_results(tmp_path):
+    output_file = tmp_path / "results.ndjson"
+
+    async def run():
+        queue = asyncio.Queue()
+        writer = asyncio.create_task(intelligent_scraper._result_writer(queue))
+        queue.put_nowait((output_file, {"bad": object()}))
+        queue.put_nowait((output_file, {"good": 1}))
+        await asyncio.wait_for(queue.join(), timeout=5)
+        alive = not writer.done()
+        writer.cancel()
+        return alive
+
+    assert asyncio.run(run())
+    assert output_file.read_bytes() == b'{"good":1}\n'
+
+
+# --- _normalize_request_case ---
+def test_normalize_request_case_keeps_url_case():
+    normalize = intelligent_scraper._normalize_request_case
+
+    assert normalize("  Scrape THE Top Posts ") == "scrape the top posts"
+    assert normalize("Visit https://example.com/Docs?Page=2 and GET posts") == \
+        "visit https://example.com/Docs?Page=2 and get posts"
+    assert normalize("Go to https://example.com/A") != normalize("Go to https://example.com/a")
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+scraper = pytest.importorskip("scraper")
+from scraper import HostRateLimiter
+
+
+def test_rate_limiter_spaces_requests_to_one_host():
+    limiter = HostRateLimiter(per_host_rps=20)
+
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire("https://example.com/page")
+    elapsed = time.monotonic() - start
+
+    # The first request starts at once, the next three wait 1/20s each
+    assert elapsed >= 3 / 20 - 0.01
+
+
+def test_rate_limiter_does_not_delay_other_hosts():
+    limiter = HostRateLimiter(per_host_rps=1)
+    limiter.acquire("https://example.com/a")
+
+    start = time.monotonic()
+    limiter.acquire("https://other.example.org/b")
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_spacing_holds_across_threads():
+    limiter = HostRateLimiter(per_host_rps=20)
+    started_at = []
+    lock = threading.Lock()
+
+    def fetch():
+        limiter.acquire("https://example.com/page")
+        with lock:
+            started_at.append(time.monotonic())
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each thread reserved its own slot, so the last one starts three intervals after the first
+    assert max(started_at) - min(started_at) >= 3 / 20 - 0.01
+
+
+def test_zero_rps_disables_the_limit():
+    limiter = HostRateLimiter(per_host_rps=0)
+
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.acquire("https://example.com/page")
+
+    assert time.monotonic() - start < 0.05
@@ -0,0 +1,163 @@
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+
+scraper = pytest.importorskip("scraper")
+from scraper import SeleniumPool
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Replace Chrome with fake drivers and record every driver started."""
+    drivers = []
+
+    def new_driver():
+        driver = FakeDriver(f"driver-{len(drivers)}")
+        drivers.append(driver)
+        return driver
+
+    monkeypatch.setattr(scraper, "_new_chrome_driver", new_driver)
+    return drivers
+
+
+def _acquire_in_thread(pool):
+    """Start acquire() on a thread; returns (thread, result dict)."""
+    result = {}
+
+    def run():
+        try:
+            result["driver"] = pool.acquire()
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, result
+
+
+def test_acquire_starts_drivers_up_to_size(started):
+    pool = SeleniumPool(size=2)
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    assert first is not second
+    assert started == [first, second]
+
+
+def test_released_driver_is_reused(started):
+    pool = SeleniumPool(size=2)
+
+    driver = pool.acquire()
+    pool.release(driver)
+
+    assert pool.acquire() is driver
+    assert len(started) == 1
+
+
+def test_release_wakes_a_waiting_acquire(started):
+    pool = SeleniumPool(size=1, acquire_timeout=5)
+    driver = pool.acquire()
+
+    thread, result = _acquire_in_thread(pool)
+    time.sleep(0.05)
+    assert thread.is_alive()
+
+    pool.release(driver)
+    thread.join(1)
+
+    assert result == {"driver": driver}
+
+
+def test_discard_lets_a_waiter_start_a_replacement(started):
+    pool = SeleniumPool(size=1, acquire_timeout=5)
+    broken = pool.acquire()
+
+    thread, result = _acquire_in_thread(pool)
+    time.sleep(0.05)
+    pool.discard(broken)
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert broken.quit_called
+    assert result["driver"] is not broken
+    assert started == [broken, result["driver"]]
+
+
+def test_acquire_times_out_when_pool_stays_full(started):
+    pool = SeleniumPool(size=1, acquire_timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+
+def test_failed_start_frees_the_slot(monkeypatch):
+    pool = SeleniumPool(size=1, acquire_timeout=0.05)
+
+    def broken_chrome():
+        raise RuntimeError("chrome missing")
+
+    monkeypatch.setattr(scraper, "_new_chrome_driver", broken_chrome)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+    monkeypatch.setattr(scraper, "_new_chrome_driver", lambda: FakeDriver("ok"))
+    assert pool.acquire().name == "ok"
+
+
+def test_close_quits_idle_and_busy_drivers(started):
+    pool = SeleniumPool(size=2)
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+
+    assert idle.quit_called and busy.quit_called
+
+
+def test_release_after_close_quits_the_driver(started):
+    pool = SeleniumPool(size=1)
+    driver = pool.acquire()
+    pool.close()
+    driver.quit_called = False
+
+    pool.release(driver)
+
+    assert driver.quit_called
+    assert pool.acquire() is not driver
+
+
+def test_open_pools_are_closed_at_exit(started):
+    pool = SeleniumPool(size=1)
+    driver = pool.acquire()
+    pool.release(driver)
+
+    scraper._close_open_pools()
+
+    assert driver.quit_called
+    assert pool not in scraper._OPEN_POOLS
+
+
+def test_unreferenced_pools_are_not_kept_alive(started):
+    pool = SeleniumPool(size=1)
+    assert pool in scraper._OPEN_POOLS
+    ref = weakref.ref(pool)
+
+    del pool
+    gc.collect()
+
+    assert ref() is None